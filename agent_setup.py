@@ -1,115 +1,134 @@
 # agent_setup.py
-from llama_index.llms.ollama import Ollama
-from llama_parse import LlamaParse
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader
-from llama_index.core.embeddings import resolve_embed_model
 from llama_index.core.tools import QueryEngineTool, ToolMetadata
 from llama_index.core.agent import ReActAgent
 from tools.code_reader import code_reader
 from tools.code_quality import code_quality_tool
 from tools.git_analyser import git_analyser_tool
-from tools.extractors import extract_docx, extract_html, extract_markdown
+from tools.context_packing import packed_query_engine
+from tools.ingestion import build_index
+from tools.models import get_llm
+from tools.uploads import session_uploads_tool, use_upload_session
 from prompts import context
+from parallel_agent import ParallelToolAgent
+from router import QueryRouter
+from react_streaming import CustomReActOutputParser, EarlyStopOllama, REACT_STOP_SEQUENCES
+from tracing import traced
+from tracing_callbacks import callback_manager
 from dotenv import load_dotenv
-import re
-import json
 from types import SimpleNamespace
+import threading
 
 load_dotenv()
 
-llm = Ollama(model="llama3.2:3b-instruct-q6_K", request_timeout=500)
-pdf_parser = LlamaParse(result_type="text")
-
-file_extractor = {
-    ".pdf": pdf_parser,
-    ".docx": lambda file: LlamaParse(result_type="text").parse(extract_docx(file)),
-    ".html": lambda file: LlamaParse(result_type="text").parse(extract_html(file)),
-    ".md": lambda file: LlamaParse(result_type="text").parse(extract_markdown(file))
-}
-
-documents = SimpleDirectoryReader("./data", file_extractor=file_extractor).load_data()
-embed_model = resolve_embed_model("local:BAAI/bge-m3")
-vector_index = VectorStoreIndex.from_documents(
-    documents,
-    embed_model=embed_model
+llm = get_llm()
+
+# Streams each ReAct step and stops generating as soon as an action is complete
+code_llm = get_llm(
+    request_timeout=1000,
+    llm_class=EarlyStopOllama,
+    temperature=0,
+    additional_kwargs={"stop": REACT_STOP_SEQUENCES}
 )
-query_engine = vector_index.as_query_engine(llm=llm)
-
-tools = [
-    QueryEngineTool(
-        query_engine=query_engine,
-        metadata=ToolMetadata(
-            name="ResumeReviewer",
-            description="Provides general professional experience information."
+
+# Heavy resources (documents, embedding model, index, agents) are built on
+# first use, or ahead of time by warm_up(), so importing this module is cheap.
+_lock = threading.Lock()
+_agent = None
+_parallel_agent = None
+_router = None
+_warm_up_thread = None
+warm_up_error = None
+
+@traced("ingestion.resume_index")
+def build_query_engine():
+    """Extract ./data locally, index it and build the ResumeReviewer query engine"""
+    vector_index = build_index("./data")
+    return packed_query_engine(vector_index, llm)
+
+def build_tools(query_engine):
+    return [
+        QueryEngineTool(
+            query_engine=query_engine,
+            metadata=ToolMetadata(
+                name="ResumeReviewer",
+                description="Provides general professional experience information."
+            ),
         ),
-    ),
-    code_reader,
-    git_analyser_tool,
-    code_quality_tool,
-]
-
-from llama_index.core.agent.react.output_parser import ReActOutputParser
-
-class SimpleAgentResponse:
-    def __init__(self, text: str, is_done: bool = True):
-        self.text = text
-        self.is_done = is_done
-
-    def get_content(self):
-        return self.text
-
-class CustomReActOutputParser(ReActOutputParser):
-    def parse(self, output: str, is_streaming: bool = False):
-        try:
-            # First, try to extract the tool output if present.
-            # Look for a pattern like "Observation: {json}" or "Observation:\n{...}"
-            obs_match = re.search(r"Observation:\s*(\{.*\})", output, re.DOTALL)
-            if obs_match:
-                # If we get JSON, try to load it
-                try:
-                    parsed_obs = json.loads(obs_match.group(1))
-                    # If the parsed output has a 'response', return that.
-                    if isinstance(parsed_obs, dict) and "response" in parsed_obs:
-                        response_text = parsed_obs["response"]
-                        return SimpleAgentResponse(response_text.strip())
-                except json.JSONDecodeError:
-                    # If it's not JSON, fallback to plain text extraction
-                    obs_text = obs_match.group(1)
-                    return SimpleAgentResponse(obs_text.strip())
-
-            # If no "Observation:" is found, check for a final answer by splitting by "Final Answer:"
-            final_match = re.search(r"Final Answer:\s*(.*)", output, re.DOTALL)
-            if final_match:
-                return SimpleAgentResponse(final_match.group(1).strip())
-
-            # If nothing special is found, fallback to the default parser
-            parsed = super().parse(output, is_streaming)
-            if isinstance(parsed, dict) and "response" in parsed:
-                resp = parsed["response"]
-                if hasattr(resp, "text"):
-                    final_text = resp.text.strip()
-                    return SimpleAgentResponse(final_text)
-                elif isinstance(resp, str):
-                    return SimpleAgentResponse(resp.strip())
-            if isinstance(parsed, str):
-                return SimpleAgentResponse(parsed.strip())
-            if hasattr(parsed, "get_content") and hasattr(parsed, "is_done"):
-                return parsed
-            return parsed
-
-        except ValueError as e:
-            if "Action: None" in output:
-                final_text = output.split("Observation:")[1].strip() if "Observation:" in output else "No additional observations provided."
-                return SimpleAgentResponse(final_text)
-            raise e
-
-code_llm = Ollama(model="llama3.2:3b-instruct-q6_K", request_timeout=1000, temperature=0)
-agent = ReActAgent.from_tools(tools, llm=code_llm, verbose=True, output_parser=CustomReActOutputParser(), context=context, temperature=0)
+        code_reader,
+        git_analyser_tool,
+        code_quality_tool,
+        session_uploads_tool,
+    ]
+
+def _init_agents():
+    global _agent, _parallel_agent, _router
+    with _lock:
+        if _agent is None:
+            query_engine = build_query_engine()
+            tools = build_tools(query_engine)
+            # Sends questions that clearly target one tool straight to it
+            _router = QueryRouter(
+                resume_query_engine=query_engine,
+                descriptions={tool.metadata.name: tool.metadata.description for tool in tools}
+            )
+            _agent = ReActAgent.from_tools(tools, llm=code_llm, verbose=True, output_parser=CustomReActOutputParser(), context=context, temperature=0, callback_manager=callback_manager)
+            # Plans all independent tool calls at once and runs them concurrently
+            _parallel_agent = ParallelToolAgent(tools, llm=llm, fallback_agent=_agent)
+
+def get_agent():
+    _init_agents()
+    return _agent
+
+def get_parallel_agent():
+    _init_agents()
+    return _parallel_agent
+
+def get_router():
+    _init_agents()
+    return _router
+
+def _warm_up():
+    global warm_up_error
+    try:
+        _init_agents()
+    except Exception as e:
+        warm_up_error = e
+
+def warm_up():
+    """Start building the agents in a background thread (only once)"""
+    global _warm_up_thread
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=_warm_up, name="agent-warm-up", daemon=True)
+            _warm_up_thread.start()
+
+def is_ready() -> bool:
+    return _agent is not None
 
 # Optionally, wrap the agent query in a function for easy access:
-def agent_query(prompt: str) -> dict:
+@traced("agent_query")
+def agent_query(prompt: str, parallel: bool = False, question: str = None, fast_path: bool = True,
+                upload_session: str = None) -> dict:
+    """
+    Answer a prompt with the agent. ``question`` is the latest user message
+    (``prompt`` may include the conversation history); when ``fast_path`` is
+    on and it clearly targets a single tool, that tool is called directly.
+    Tools see the files uploaded in ``upload_session``.
+    """
+    with use_upload_session(upload_session):
+        return _agent_query(prompt, parallel, question, fast_path)
+
+def _agent_query(prompt: str, parallel: bool, question: str, fast_path: bool):
+    if fast_path:
+        router = get_router()
+        route = router.route(question or prompt)
+        if route is not None:
+            response = router.dispatch(route)
+            if response is not None:
+                return SimpleNamespace(response=response, route=route.tool)
+
     try:
-        result = agent.query(prompt)
+        result = get_parallel_agent().query(prompt) if parallel else get_agent().query(prompt)
     except ValueError as e:
         if "Could not parse output" in str(e):
             return SimpleNamespace(response=str(e))
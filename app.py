@@ -1,15 +1,97 @@
+import time
+_script_start = time.perf_counter()
+
 import os
 os.environ["PYTORCH_CUDA_ALLOC_CONF"] = "expandable_segments:True"
 
+import logging
+import sys
+import threading
+import uuid
 import streamlit as st
-from agent_setup import agent_query
 from db.database import db
+from tracing import start_metrics_server, start_trace
 from datetime import datetime
 import pytz
-import torch
+
+# Time allowed from script start until the chat history is on screen. The
+# agent, embedding model and torch are loaded in the background and must
+# never count towards it.
+STARTUP_BUDGET_SECONDS = 1.0
+
+@st.cache_resource(show_spinner=False)
+def start_agent_warm_up():
+    """Import and build the agent off the script thread so the UI renders immediately"""
+    state = {"thread": None, "error": None}
+
+    def warm_up():
+        try:
+            import agent_setup
+        except Exception as e:
+            # agent_setup only records failures that happen after it has imported
+            state["error"] = e
+            return
+        agent_setup.warm_up()
+
+    state["thread"] = threading.Thread(target=warm_up, name="agent-import", daemon=True)
+    state["thread"].start()
+    return state
+
+def agent_status(warm_up_state: dict):
+    """Return (ready, error) for the background agent warm-up"""
+    if warm_up_state["error"] is not None:
+        return False, warm_up_state["error"]
+    agent_setup = sys.modules.get("agent_setup")
+    if agent_setup is None or not hasattr(agent_setup, "is_ready"):
+        return False, None
+    return agent_setup.is_ready(), agent_setup.warm_up_error
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_exporter(port: int):
+    """Expose Prometheus metrics once per process"""
+    return start_metrics_server(port)
+
+def render_turn_breakdown(trace: dict):
+    """Per-stage timing panel for one assistant turn"""
+    with st.expander(f"⏱ Turn breakdown ({trace['total_ms'] / 1000:.1f}s)"):
+        stages = sorted(trace["stages"].items(), key=lambda item: -item[1]["total_ms"])
+        st.table([
+            {"stage": name, "calls": stage["count"], "total (ms)": stage["total_ms"]}
+            for name, stage in stages
+        ])
+        if trace["counters"]:
+            st.json(trace["counters"])
+
+def render_upload_status(upload_session: str):
+    """Ingestion status of this session's uploads"""
+    from tools.uploads import upload_store
+
+    icons = {"queued": "⏳", "indexing": "🔄", "ready": "✅", "failed": "❌"}
+    for record in upload_store.uploads(upload_session):
+        detail = f" ({record['error']})" if record["error"] else ""
+        st.caption(f"{icons[record['status']]} {record['name']}: {record['status']}{detail}")
+
+@st.fragment(run_every=2)
+def poll_upload_status(upload_session: str):
+    """Upload status refreshed while files index; reruns the app once they are done so polling stops"""
+    from tools.uploads import upload_store
+
+    render_upload_status(upload_session)
+    if not upload_store.pending(upload_session):
+        st.rerun()
+
+def free_gpu_cache():
+    """Release cached GPU memory, but only if the models have already loaded torch"""
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
 
 st.set_page_config(page_title="RAG-Agent Chat", page_icon="🤖", layout="wide")
 
+warm_up_state = start_agent_warm_up()
+if os.getenv("METRICS_PORT"):
+    start_metrics_exporter(int(os.getenv("METRICS_PORT")))
+
 # -------------------------
 # Custom CSS for Sidebar 
 # -------------------------
@@ -78,6 +160,9 @@ st.markdown("""
 # -------------------------
 if 'current_session_id' not in st.session_state:
     st.session_state.current_session_id = None
+# Uploads belong to the browser session, so concurrent users never share them
+if 'upload_session' not in st.session_state:
+    st.session_state.upload_session = uuid.uuid4().hex
 
 # -------------------------
 # SIDEBAR
@@ -97,6 +182,16 @@ with st.sidebar:
         st.query_params.clear()  
         st.rerun()
 
+    ready, error = agent_status(warm_up_state)
+    if error is not None:
+        st.caption(f"🔴 Agent failed to load: {error}")
+    elif ready:
+        st.caption("🟢 Agent ready")
+    else:
+        st.caption("🟡 Agent warming up...")
+
+    show_breakdown = st.toggle("Show turn breakdown")
+
     st.markdown("---")
 
     # Scrollable container for session list
@@ -136,14 +231,8 @@ uploaded_file = st.file_uploader(
 
 st.markdown("</div>", unsafe_allow_html=True)
 
-# If a file was uploaded, save it as "temp_code.py" or a chosen name
-if uploaded_file is not None:
-    file_path = os.path.join("data", "temp_code.py")
-    if os.path.exists(file_path):
-        os.remove(file_path)
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-    st.success(f"File {uploaded_file.name} uploaded successfully!")
+# Filled in after the chat history, so handling uploads never delays it
+upload_status = st.container()
 
 if st.session_state.current_session_id:
     messages = db.get_session_messages(st.session_state.current_session_id)
@@ -154,6 +243,24 @@ else:
 for msg in messages:
     with st.chat_message(msg["role"]):
         st.write(msg["content"])
+        if show_breakdown and msg["metadata"] and "trace" in msg["metadata"]:
+            render_turn_breakdown(msg["metadata"]["trace"])
+
+# Store uploads per session under their content hash; indexing runs in the background
+if uploaded_file is not None:
+    from tools.uploads import upload_store
+    upload_store.save(st.session_state.upload_session, uploaded_file.name, uploaded_file.getvalue())
+if "tools.uploads" in sys.modules:
+    from tools.uploads import upload_store
+    with upload_status:
+        if upload_store.pending(st.session_state.upload_session):
+            poll_upload_status(st.session_state.upload_session)
+        else:
+            render_upload_status(st.session_state.upload_session)
+
+startup_seconds = time.perf_counter() - _script_start
+if startup_seconds > STARTUP_BUDGET_SECONDS:
+    logging.warning("Chat UI took %.2fs to render, over the %.2fs budget", startup_seconds, STARTUP_BUDGET_SECONDS)
 
 # -------------------------
 # Chat input using st.chat_input (always pinned at bottom)
@@ -180,13 +287,23 @@ if user_input:
         conversation_history += f"{msg['role']}: {msg['content']}\n"
     full_prompt = conversation_history + "User: " + user_input
 
+    # Progress of long-running tools, such as a project-wide quality scan
+    progress = st.empty()
+
+    def show_progress(message: str, done: int, total: int):
+        progress.progress(done / total if total else 1.0, text=f"{message} ({done}/{total})")
+
     # Query the agent with the full prompt
-    with st.spinner("🤖 Thinking..."):
-        result = agent_query(full_prompt)
+    with st.spinner("🤖 Thinking..."), start_trace(on_progress=show_progress) as trace:
+        # Waits for the background warm-up if it hasn't finished yet
+        from agent_setup import agent_query
+        result = agent_query(full_prompt, question=user_input, upload_session=st.session_state.upload_session)
+    progress.empty()
     
-    torch.cuda.empty_cache()
+    free_gpu_cache()
 
-    db.add_message(st.session_state.current_session_id, "assistant", result.response)
+    db.add_message(st.session_state.current_session_id, "assistant", result.response,
+                   metadata={"trace": trace.to_dict()})
     with st.chat_message("assistant"):
         if isinstance(result.response, dict):
             st.write(result.response["response"])
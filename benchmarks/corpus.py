@@ -0,0 +1,93 @@
+# benchmarks/corpus.py
+
+import os
+import random
+import subprocess
+
+WORDS = (
+    "agent retrieval index vector embedding commit branch query latency cache "
+    "parser tool session upload chunk token model prompt context report metric "
+    "python function class module test review refactor performance database"
+).split()
+
+def _sentence(rng: random.Random, length: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+def _paragraph(rng: random.Random, sentences: int = 6) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+def generate_documents(directory: str, count: int, seed: int = 0):
+    """Write a mix of .md, .txt and .html documents for ./data ingestion"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        paragraphs = [_paragraph(rng) for _ in range(rng.randint(3, 10))]
+        kind = i % 3
+        if kind == 0:
+            path = os.path.join(directory, f"bench_doc_{i}.md")
+            body = f"# Document {i}\n\n" + "\n\n".join(paragraphs)
+        elif kind == 1:
+            path = os.path.join(directory, f"bench_doc_{i}.txt")
+            body = "\n\n".join(paragraphs)
+        else:
+            path = os.path.join(directory, f"bench_doc_{i}.html")
+            body = f"<html><body><h1>Document {i}</h1>" + "".join(f"<p>{p}</p>" for p in paragraphs) + "</body></html>"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(body)
+
+def _python_function(rng: random.Random, index: int) -> str:
+    branches = rng.randint(1, 12)
+    lines = [f"def {rng.choice(WORDS)}_{index}(value, options=None):",
+             f'    """{_sentence(rng)}"""',
+             "    result = 0"]
+    for b in range(branches):
+        keyword = "if" if b == 0 else "elif"
+        lines.append(f"    {keyword} value == {b}:")
+        lines.append(f"        result += {rng.randint(1, 100)}")
+    lines.append("    else:")
+    lines.append("        result = -1")
+    lines.append("    return result")
+    return "\n".join(lines)
+
+def generate_python_files(directory: str, count: int, functions_per_file: int = 200, seed: int = 0):
+    """Write large Python modules for CodeVectorStore and CodeQualityAnalyzer"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        functions = [_python_function(rng, n) for n in range(functions_per_file)]
+        path = os.path.join(directory, f"bench_module_{i}.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f'"""Synthetic benchmark module {i}."""\n\n\n' + "\n\n\n".join(functions) + "\n")
+        paths.append(path)
+    return paths
+
+def generate_git_repo(directory: str, commits: int, seed: int = 0):
+    """
+    Create a local repository with ``commits`` commits using git fast-import,
+    which builds thousands of commits in a fraction of a second.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    subprocess.run(["git", "init", "-q", "-b", "master", directory], check=True)
+
+    stream = []
+    timestamp = 1_700_000_000
+    for i in range(commits):
+        content = "\n".join(_sentence(rng) for _ in range(rng.randint(2, 8))) + "\n"
+        data = content.encode("utf-8")
+        message = f"{rng.choice(['Fix', 'Add', 'Refactor', 'Speed up'])} {rng.choice(WORDS)} {rng.choice(WORDS)} ({i})".encode("utf-8")
+        timestamp += rng.randint(60, 86_400)
+        stream.append(b"commit refs/heads/master\n")
+        stream.append(f"mark :{i + 1}\n".encode("utf-8"))
+        stream.append(f"author Bench <bench@example.com> {timestamp} +0000\n".encode("utf-8"))
+        stream.append(f"committer Bench <bench@example.com> {timestamp} +0000\n".encode("utf-8"))
+        stream.append(f"data {len(message)}\n".encode("utf-8") + message + b"\n")
+        if i > 0:
+            stream.append(f"from :{i}\n".encode("utf-8"))
+        stream.append(f"M 644 inline src/file_{i % 50}.txt\n".encode("utf-8"))
+        stream.append(f"data {len(data)}\n".encode("utf-8") + data + b"\n")
+
+    subprocess.run(["git", "fast-import", "--quiet"], input=b"".join(stream), cwd=directory, check=True)
+    subprocess.run(["git", "checkout", "-q", "-f", "master"], cwd=directory, check=True)
+    return directory
@@ -0,0 +1,46 @@
+# benchmarks/fake_db.py
+
+import itertools
+from datetime import datetime
+from typing import Dict, List, Optional
+
+class InMemoryDatabase:
+    """Stand-in for db.database.Database that keeps chat sessions in memory"""
+
+    def __init__(self, sessions: int = 20, messages_per_session: int = 10):
+        self._ids = itertools.count(1)
+        self.sessions = {}
+        self.messages = {}
+        for i in range(sessions):
+            session_id = self.create_session(f"Session {i}")
+            for j in range(messages_per_session):
+                self.add_message(session_id, "user" if j % 2 == 0 else "assistant", f"Message {j}")
+
+    def create_session(self, name: str) -> int:
+        session_id = next(self._ids)
+        self.sessions[session_id] = {"id": session_id, "name": name, "created_at": datetime.now()}
+        self.messages[session_id] = []
+        return session_id
+
+    def get_sessions(self) -> List[Dict]:
+        return sorted(self.sessions.values(), key=lambda session: session["created_at"], reverse=True)
+
+    def get_session_messages(self, session_id: int) -> List[Dict]:
+        return list(self.messages.get(session_id, []))
+
+    def add_message(self, session_id: int, role: str, content: str, metadata: Optional[Dict] = None) -> int:
+        message_id = next(self._ids)
+        self.messages[session_id].append({"id": message_id, "role": role, "content": content,
+                                          "metadata": metadata, "created_at": datetime.now()})
+        return message_id
+
+    def delete_all_sessions(self):
+        self.sessions.clear()
+        self.messages.clear()
+
+    def delete_session(self, session_id: int) -> bool:
+        self.messages.pop(session_id, None)
+        return self.sessions.pop(session_id, None) is not None
+
+    def close(self):
+        pass
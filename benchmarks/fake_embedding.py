@@ -0,0 +1,38 @@
+# benchmarks/fake_embedding.py
+
+import hashlib
+import math
+import re
+from typing import List
+
+from llama_index.core.embeddings import BaseEmbedding
+
+class HashEmbedding(BaseEmbedding):
+    """
+    Tiny deterministic bag-of-words embedding (the hashing trick). Runs on
+    CPU in microseconds, so benchmarks measure the pipeline rather than bge-m3,
+    while still ranking texts that share words as similar.
+    """
+
+    dim: int = 256
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "HashEmbedding"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        for word in re.findall(r"\w+", text.lower()):
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dim] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._embed(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
@@ -0,0 +1,106 @@
+# benchmarks/fake_ollama.py
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeOllamaServer:
+    """
+    Minimal stand-in for the Ollama HTTP API (/api/chat and /api/generate)
+    with deterministic replies. ReAct prompts get one CodeReader action and
+    then a final answer; tool-planning prompts get an empty plan; everything
+    else gets a short synthetic answer. ``token_delay`` simulates generation
+    speed per streamed token.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, token_delay: float = 0.0,
+                 tool_file: str = "bench_module_0.py"):
+        self.token_delay = token_delay
+        self.tool_file = tool_file
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reply(self, prompt: str, last_message: str = "") -> str:
+        if "Output only a JSON list" in prompt:
+            return "[]"
+        if "Action Input" in prompt:
+            # The ReAct system header itself mentions "Observation:", so only a
+            # tool result as the latest message means the action has run
+            if not last_message.lstrip().startswith("Observation:"):
+                return ("Thought: I need to use a tool to help me answer the question.\n"
+                        "Action: CodeReader\n"
+                        f'Action Input: {{"file_name": "{self.tool_file}", "query": "What does this module do?"}}\n')
+            return "Thought: I can answer without using any more tools.\nAnswer: The module defines synthetic benchmark functions."
+        return f"Synthetic answer based on {len(prompt)} characters of context."
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                server.requests += 1
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path == "/api/chat":
+                    messages = body.get("messages", [])
+                    prompt = "\n".join(m.get("content", "") for m in messages)
+                    last_message = messages[-1].get("content", "") if messages else ""
+                    chat = True
+                elif self.path == "/api/generate":
+                    prompt = last_message = body.get("prompt", "")
+                    chat = False
+                else:
+                    self.send_error(404)
+                    return
+
+                text = server.reply(prompt, last_message)
+                counts = {"prompt_eval_count": len(prompt.split()), "eval_count": len(text.split())}
+
+                def chunk(piece: str, done: bool) -> dict:
+                    data = {"model": body.get("model"), "done": done}
+                    if chat:
+                        data["message"] = {"role": "assistant", "content": piece}
+                    else:
+                        data["response"] = piece
+                    if done:
+                        data.update(counts)
+                    return data
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                if body.get("stream", True):
+                    try:
+                        for token in text.split(" "):
+                            if server.token_delay:
+                                time.sleep(server.token_delay)
+                            self.wfile.write((json.dumps(chunk(token + " ", False)) + "\n").encode("utf-8"))
+                            self.wfile.flush()
+                        self.wfile.write((json.dumps(chunk("", True)) + "\n").encode("utf-8"))
+                    except (BrokenPipeError, ConnectionResetError):
+                        # The client stopped the stream early
+                        pass
+                else:
+                    if server.token_delay:
+                        time.sleep(server.token_delay * len(text.split(" ")))
+                    self.wfile.write(json.dumps(chunk(text, True)).encode("utf-8"))
+
+        return Handler
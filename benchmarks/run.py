@@ -0,0 +1,173 @@
+# benchmarks/run.py
+"""
+Reproducible performance benchmark for the agent.
+
+Generates synthetic corpora in a temporary directory, points every Ollama
+client at a local fake server and swaps bge-m3 for a hashing embedding, then
+times ingestion, retrieval, code quality analysis and full agent turns. Runs
+on a CPU-only box without network and prints a JSON report:
+
+    python -m benchmarks.run --output bench.json
+"""
+
+import argparse
+import json
+import math
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUERIES = [
+    "How are the options handled?",
+    "Which function returns the largest result?",
+    "What happens for unknown values?",
+    "Find changes related to performance",
+    "Which commits touched the parser?",
+]
+
+def peak_rss_mb() -> Dict:
+    """Peak resident set size so far, for this process and its reaped children"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {"self": round(own / 1024, 1), "children": round(children / 1024, 1)}
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+def measure(fn: Callable, items: List, units_per_item: int = 1) -> Dict:
+    """Call ``fn`` once per item and summarise the latencies"""
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        t = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    return {
+        "count": len(items) * units_per_item,
+        "total_seconds": round(total, 4),
+        "throughput_per_second": round(len(items) * units_per_item / total, 2) if total else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def tree_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def run(args) -> Dict:
+    from benchmarks.corpus import generate_documents, generate_python_files, generate_git_repo
+    from benchmarks.fake_ollama import FakeOllamaServer
+    from benchmarks.startup import measure_startup
+
+    workdir = tempfile.mkdtemp(prefix="rag-bench-")
+    server = FakeOllamaServer(token_delay=args.token_delay).start()
+    os.environ["OLLAMA_BASE_URL"] = server.base_url
+    os.chdir(workdir)
+
+    try:
+        generate_documents("data", args.docs, seed=args.seed)
+        py_paths = generate_python_files("data", args.py_files, args.functions, seed=args.seed)
+        repo_path = generate_git_repo(os.path.join(workdir, "bench_repo"), args.commits, seed=args.seed)
+        queries = (QUERIES * args.queries)[:args.queries]
+        app_startup = measure_startup()
+
+        start = time.perf_counter()
+        import agent_setup
+        import_seconds = time.perf_counter() - start
+
+        from benchmarks.fake_embedding import HashEmbedding
+        from tools.models import set_embed_model
+        from tools.ingestion import build_index
+        from tools.code_reader import code_vector_store
+        from tools.git_analyser import git_vector_store
+        from tools.code_quality import CodeQualityAnalyzer
+
+        set_embed_model(HashEmbedding())
+        stages = {}
+
+        stages["ingestion"] = measure(lambda _: build_index("data"), [None],
+                                      units_per_item=args.docs + args.py_files)
+        stages["ingestion_cached"] = measure(lambda _: build_index("data"), [None],
+                                             units_per_item=args.docs + args.py_files)
+
+        stages["code_index"] = measure(code_vector_store.process_file, py_paths)
+        stages["code_retrieval"] = measure(lambda q: code_vector_store.query_code(py_paths[0], q), queries)
+
+        stages["git_index"] = measure(lambda _: git_vector_store.process_repo(repo_path, limit=args.commits),
+                                      [None], units_per_item=args.commits)
+        stages["git_retrieval"] = measure(lambda q: git_vector_store.query_commits(repo_path, q), queries)
+
+        if not args.skip_quality:
+            analyzer = CodeQualityAnalyzer()
+            try:
+                stages["code_quality"] = measure(analyzer.analyze_files, [py_paths], units_per_item=len(py_paths))
+                stages["code_quality_cached"] = measure(analyzer.analyze_files, [py_paths], units_per_item=len(py_paths))
+            finally:
+                analyzer.close()
+
+        stages["agent_init"] = measure(lambda _: agent_setup.get_agent(), [None])
+        stages["agent_turn"] = measure(agent_setup.agent_query, queries[:args.turns])
+
+        return {
+            "commit": tree_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "config": vars(args),
+            "import_seconds": round(import_seconds, 4),
+            "app_startup": app_startup,
+            "llm_requests": server.requests,
+            "stages": stages,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    finally:
+        server.stop()
+        os.chdir(REPO_ROOT)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, retrieval and agent turns")
+    parser.add_argument("--docs", type=int, default=60, help="synthetic documents for ./data")
+    parser.add_argument("--py-files", type=int, default=4, help="large Python files to index and analyze")
+    parser.add_argument("--functions", type=int, default=200, help="functions per Python file")
+    parser.add_argument("--commits", type=int, default=2000, help="commits in the synthetic git repo")
+    parser.add_argument("--queries", type=int, default=20, help="retrieval queries per store")
+    parser.add_argument("--turns", type=int, default=5, help="full agent_query turns")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds per token from the fake LLM")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-quality", action="store_true", help="skip pylint/radon analysis")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary working directory")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    report = run(args)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    startup = report["app_startup"]
+    if "error" in startup or startup["exceptions"] or not startup["within_budget"]:
+        print(f"Chat UI first render failed or exceeded its budget: {startup}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 import json
+from tracing import traced
 
 load_dotenv()
 
@@ -18,6 +19,7 @@ class Database:
             port=os.getenv("POSTGRES_PORT", "5432")
         )
         
+    @traced("db.create_session")
     def create_session(self, name: str) -> int:
         """Create a new chat session"""
         with self.conn.cursor() as cur:
@@ -33,6 +35,7 @@ class Database:
             self.conn.commit()
             return session_id
             
+    @traced("db.get_sessions")
     def get_sessions(self) -> List[Dict]:
         """Get all chat sessions"""
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -45,6 +48,7 @@ class Database:
             )
             return cur.fetchall()
             
+    @traced("db.get_session_messages")
     def get_session_messages(self, session_id: int) -> List[Dict]:
         """Get all messages for a session"""
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -59,6 +63,7 @@ class Database:
             )
             return cur.fetchall()
             
+    @traced("db.add_message")
     def add_message(self, session_id: int, role: str, content: str, metadata: Optional[Dict] = None) -> int:
         """Add a new message to a session"""
         with self.conn.cursor() as cur:
@@ -89,12 +94,14 @@ class Database:
             self.conn.commit()
             return message_id
 
+    @traced("db.delete_all_sessions")
     def delete_all_sessions(self):
         cur = self.conn.cursor()
         cur.execute("TRUNCATE TABLE chat_sessions RESTART IDENTITY CASCADE;")
         cur.execute("TRUNCATE TABLE chat_messages RESTART IDENTITY CASCADE;")
         self.conn.commit()
 
+    @traced("db.delete_session")
     def delete_session(self, session_id: int) -> bool:
         """Delete a chat session and all its messages"""
         try:
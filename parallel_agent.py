@@ -0,0 +1,120 @@
+# parallel_agent.py
+
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import dirtyjson
+from llama_index.core.tools import ToolOutput
+from prompts import tool_plan_template, tool_answer_template
+
+class ParallelToolAgent:
+    """
+    Agent mode that asks the LLM for every tool call a question needs in a
+    single planning step, runs those calls concurrently and then answers from
+    the merged observations. Latency approaches the slowest tool instead of
+    the sum of all of them.
+
+    Calls to the same tool run one after another on one worker, since the
+    tools share state (the ``./temp_repo`` clone, the pylint linter); calls to
+    different tools run in parallel. Falls back to ``fallback_agent`` when
+    the planner proposes nothing usable.
+    """
+
+    def __init__(self, tools, llm, fallback_agent=None, max_workers: Optional[int] = None):
+        self.tools = {tool.metadata.name: tool for tool in tools}
+        self.llm = llm
+        self.fallback_agent = fallback_agent
+        self.max_workers = max_workers or len(self.tools)
+
+    def _describe_tools(self) -> str:
+        return "\n".join(
+            f"- {name}: {tool.metadata.description}\n  Arguments: {tool.metadata.fn_schema_str}"
+            for name, tool in self.tools.items()
+        )
+
+    def plan(self, question: str) -> List[Dict]:
+        """Ask the LLM for the independent tool calls needed to answer a question"""
+        prompt = tool_plan_template.format(
+            tool_descriptions=self._describe_tools(),
+            question=question
+        )
+        output = self.llm.complete(prompt).text
+
+        start, end = output.find("["), output.rfind("]")
+        if start == -1 or end < start:
+            return []
+        try:
+            calls = json.loads(output[start:end + 1])
+        except json.JSONDecodeError:
+            try:
+                calls = dirtyjson.loads(output[start:end + 1])
+            except Exception:
+                return []
+
+        if not isinstance(calls, list):
+            return []
+        # Calls whose input isn't an object of arguments (e.g. a bare file name) are
+        # dropped; with nothing usable left the question goes to the fallback agent
+        return [
+            {"tool": call["tool"], "input": dict(call.get("input") or {})}
+            for call in calls
+            if isinstance(call, dict) and call.get("tool") in self.tools
+            and isinstance(call.get("input") or {}, dict)
+        ]
+
+    def _call_tool(self, call: Dict) -> ToolOutput:
+        tool = self.tools[call["tool"]]
+        try:
+            return tool.call(**call["input"])
+        except Exception as e:
+            return ToolOutput(
+                content=f"Error running {call['tool']}: {str(e)}",
+                tool_name=call["tool"],
+                raw_input=call["input"],
+                raw_output=None,
+            )
+
+    def _call_tools_in_order(self, calls: List[Dict]) -> List[ToolOutput]:
+        return [self._call_tool(call) for call in calls]
+
+    def run_tools(self, calls: List[Dict]) -> List[ToolOutput]:
+        """Run the planned calls concurrently, returning outputs in plan order"""
+        by_tool = {}
+        for index, call in enumerate(calls):
+            by_tool.setdefault(call["tool"], []).append(index)
+
+        outputs = [None] * len(calls)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Each worker runs in a copy of this context so its spans join the current trace
+            futures = {
+                pool.submit(contextvars.copy_context().run, self._call_tools_in_order,
+                            [calls[i] for i in indexes]): indexes
+                for indexes in by_tool.values()
+            }
+            for future, indexes in futures.items():
+                for index, output in zip(indexes, future.result()):
+                    outputs[index] = output
+        return outputs
+
+    def query(self, question: str):
+        calls = self.plan(question)
+        if not calls:
+            if self.fallback_agent is not None:
+                return self.fallback_agent.query(question)
+            return SimpleNamespace(response=self.llm.complete(question).text, sources=[])
+
+        outputs = self.run_tools(calls)
+        observations = "\n\n".join(
+            f"[{index + 1}] {call['tool']}({json.dumps(call['input'])}):\n{output.content}"
+            for index, (call, output) in enumerate(zip(calls, outputs))
+        )
+        answer = self.llm.complete(
+            tool_answer_template.format(question=question, observations=observations)
+        ).text
+        if "Final Answer:" in answer:
+            answer = answer.split("Final Answer:", 1)[1]
+
+        return SimpleNamespace(response=answer.strip(), sources=outputs)
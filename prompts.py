@@ -18,3 +18,35 @@ Output the result in the following JSON Format:
     "description": <string>,
     "filename": <string>
 }"""
+
+tool_plan_template = """You can call the following tools:
+{tool_descriptions}
+
+Decide which tool calls are needed to answer the question below. The calls must be
+independent of each other, because they will run at the same time.
+Question: {question}
+
+Output only a JSON list in the following format, or [] if no tool is needed:
+[
+    {{"tool": <tool name>, "input": {{<argument name>: <value>}}}}
+]"""
+
+tool_answer_template = """Answer the question using the tool outputs below.
+Question: {question}
+
+Tool outputs:
+{observations}
+
+Conclude your response with "Final Answer:" immediately followed by the concise final answer."""
+
+chunk_explain_template = """Explain the following part of the file {file_name} in simple terms.
+Say what it does and how it fits into the rest of the file, in a few sentences.
+
+{chunk_name}:
+{code}"""
+
+explain_reduce_template = """Below are explanations of the parts of {file_name}, in file order.
+Combine them into one clear explanation of the whole file: its purpose, its main
+components and how they work together.
+
+{explanations}"""
@@ -0,0 +1,264 @@
+# react_streaming.py
+
+import json
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+import dirtyjson
+import httpx
+from llama_index.core.agent.react.output_parser import ReActOutputParser
+from llama_index.core.agent.react.types import (
+    ActionReasoningStep,
+    BaseReasoningStep,
+    ResponseReasoningStep,
+)
+from llama_index.core.base.llms.types import ChatMessage, ChatResponse, MessageRole
+from llama_index.core.llms.callbacks import llm_chat_callback
+from llama_index.llms.ollama import Ollama
+
+THOUGHT = "Thought:"
+ACTION = "Action:"
+ACTION_INPUT = "Action Input:"
+ANSWER = "Answer:"
+OBSERVATION = "Observation:"
+MARKERS = (THOUGHT, ACTION, ACTION_INPUT, ANSWER, OBSERVATION)
+
+# Sent to Ollama so the model never starts writing a tool result itself
+REACT_STOP_SEQUENCES = [OBSERVATION]
+
+class ReActStreamParser:
+    """
+    Incremental parser for a single ReAct step.
+
+    Text is fed in as it arrives from the LLM. Only the newly received part of
+    the buffer is searched for the ``Thought:``/``Action:``/``Action Input:``/
+    ``Answer:`` markers, and the Action Input JSON is brace-matched as it
+    streams, so ``feed`` can report the moment an action is complete and
+    generation can be stopped.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.positions = {}  # Map of marker -> index of its first occurrence
+        self._scan_from = 0
+        self._input_start = None
+        self._input_end = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._scan_input_from = None
+        self.complete = False
+
+    def feed(self, delta: str) -> bool:
+        """Add a chunk of generated text. Returns True once the step is complete."""
+        if self.complete or not delta:
+            return self.complete
+        self.text += delta
+        self._find_markers()
+        if OBSERVATION in self.positions:
+            self.complete = True
+        elif self._input_start is not None and ANSWER not in self.positions:
+            self._scan_action_input()
+        return self.complete
+
+    def _find_markers(self):
+        # Back up far enough to catch a marker split across two chunks
+        overlap = max(len(marker) for marker in MARKERS) - 1
+        start = max(0, self._scan_from - overlap)
+        for marker in MARKERS:
+            if marker not in self.positions:
+                index = self.text.find(marker, start)
+                if index != -1:
+                    self.positions[marker] = index
+        self._scan_from = len(self.text)
+
+        if self._input_start is None and ACTION_INPUT in self.positions:
+            self._input_start = self.positions[ACTION_INPUT] + len(ACTION_INPUT)
+            self._scan_input_from = self._input_start
+
+    def _scan_action_input(self):
+        """Brace-match the Action Input JSON over the text received so far"""
+        end = len(self.text)
+        if OBSERVATION in self.positions:
+            end = self.positions[OBSERVATION]
+
+        for index in range(self._scan_input_from, end):
+            char = self.text[index]
+            if self._depth == 0:
+                if char.isspace():
+                    continue
+                if char != "{":
+                    # Plain-text input: it ends with the line
+                    newline = self.text.find("\n", index, end)
+                    if newline != -1:
+                        self._input_end = newline
+                        self.complete = True
+                    self._scan_input_from = index
+                    return
+                self._depth = 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._input_end = index + 1
+                    self.complete = True
+                    return
+        self._scan_input_from = end
+
+    def _thought(self, end: int) -> str:
+        if THOUGHT not in self.positions or self.positions[THOUGHT] > end:
+            return ""
+        return self.text[self.positions[THOUGHT] + len(THOUGHT):end].strip()
+
+    def result(self, is_streaming: bool = False) -> BaseReasoningStep:
+        """Build the reasoning step from everything received"""
+        text = self.text
+        end = self.positions.get(OBSERVATION, len(text))
+        answer = self.positions.get(ANSWER)
+        action = self.positions.get(ACTION)
+
+        if OBSERVATION in self.positions:
+            observation = _observation_response(text[end + len(OBSERVATION):])
+            if observation is not None:
+                return ResponseReasoningStep(
+                    thought=self._thought(action if action is not None else end),
+                    response=observation,
+                    is_streaming=is_streaming,
+                )
+
+        if answer is not None and (action is None or answer < action):
+            thought_end = answer
+            if text[:answer].rstrip().endswith("Final"):
+                thought_end = text.rfind("Final", 0, answer)
+            return ResponseReasoningStep(
+                thought=self._thought(thought_end),
+                response=text[answer + len(ANSWER):].strip(),
+                is_streaming=is_streaming,
+            )
+
+        if THOUGHT not in self.positions and action is None:
+            return ResponseReasoningStep(
+                thought="(Implicit) I can answer without any more tools!",
+                response=text[:end].strip(),
+                is_streaming=is_streaming,
+            )
+
+        if action is None or self._input_start is None:
+            raise ValueError(f"Could not parse output: {text}")
+
+        action_name = text[action + len(ACTION):self.positions[ACTION_INPUT]].strip()
+        if action_name.lower() == "none":
+            observation = text[end + len(OBSERVATION):].strip() if end < len(text) else ""
+            return ResponseReasoningStep(
+                thought=self._thought(action),
+                response=observation or "No additional observations provided.",
+                is_streaming=is_streaming,
+            )
+
+        input_end = self._input_end if self._input_end is not None else end
+        action_input = text[self._input_start:input_end].strip()
+        return ActionReasoningStep(
+            thought=self._thought(action),
+            action=action_name,
+            action_input=_load_action_input(action_input),
+        )
+
+def _observation_response(text: str) -> Optional[str]:
+    """
+    Answer taken from a tool result the model wrote itself after
+    ``Observation:``: the ``response`` of a JSON object, or the raw text if it
+    isn't valid JSON. None if there is no such object.
+    """
+    start, stop = text.find("{"), text.rfind("}")
+    if start == -1 or stop < start or text[:start].strip():
+        return None
+    try:
+        parsed = json.loads(text[start:stop + 1])
+    except json.JSONDecodeError:
+        return text[start:stop + 1].strip()
+    if isinstance(parsed, dict) and "response" in parsed:
+        return str(parsed["response"]).strip()
+    return None
+
+def _load_action_input(action_input: str) -> dict:
+    if not action_input.startswith("{"):
+        return {"input": action_input}
+    try:
+        return json.loads(action_input)
+    except json.JSONDecodeError:
+        return dict(dirtyjson.loads(action_input))
+
+class CustomReActOutputParser(ReActOutputParser):
+    """ReAct output parser that reads the output in a single incremental pass"""
+
+    def parse(self, output: str, is_streaming: bool = False) -> BaseReasoningStep:
+        parser = ReActStreamParser()
+        parser.feed(output)
+        return parser.result(is_streaming=is_streaming)
+
+class EarlyStopOllama(Ollama):
+    """
+    Ollama client whose ``chat`` streams the reply through a
+    ``ReActStreamParser`` and hangs up as soon as an action is complete, so
+    the tool can start running without waiting for the rest of the generation.
+    """
+
+    def _stream_chunks(self, messages: Sequence[ChatMessage], **kwargs: Any) -> Iterator[Dict]:
+        """
+        Raw /api/chat stream chunks, including the final one with the token
+        counts. Unlike ``stream_chat`` this emits no callback event of its own,
+        so each ``chat`` call is exactly one LLM event however the stream ends.
+        """
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": message.role.value, "content": message.content, **message.additional_kwargs}
+                for message in messages
+            ],
+            "options": self._model_kwargs,
+            "stream": True,
+            **kwargs,
+        }
+        with httpx.Client(timeout=httpx.Timeout(self.request_timeout)) as client:
+            with client.stream(method="POST", url=f"{self.base_url}/api/chat", json=payload) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line:
+                        yield json.loads(line)
+
+    @llm_chat_callback()
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        parser = ReActStreamParser()
+        raw = {}
+        chunks = 0
+        stream = self._stream_chunks(messages, **kwargs)
+        try:
+            for raw in stream:
+                if raw.get("done"):
+                    break
+                chunks += 1
+                if parser.feed(raw.get("message", {}).get("content") or ""):
+                    break
+        finally:
+            # Closing the generator closes the HTTP stream, which stops Ollama generating
+            stream.close()
+
+        # Ollama only reports token counts on the final chunk, which is never
+        # received when the stream is cut short; one chunk is one token
+        raw = dict(raw)
+        raw.setdefault("eval_count", chunks)
+
+        return ChatResponse(
+            message=ChatMessage(role=MessageRole.ASSISTANT, content=parser.text),
+            raw=raw,
+        )
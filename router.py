@@ -0,0 +1,151 @@
+# router.py
+
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from tools.code_quality import code_quality_tool_func
+from tools.code_reader import code_reader_func
+from tools.git_analyser import git_query
+from tools.models import get_embed_model
+from tracing import count, span, traced
+
+logger = logging.getLogger(__name__)
+
+# Minimum cosine similarity, and lead over the runner-up, for an embedding-only route
+EMBED_THRESHOLD = 0.55
+EMBED_MARGIN = 0.05
+
+REPO_URL = re.compile(r"(https?://\S+|git@\S+:\S+)")
+FILE_NAME = re.compile(r"\b([\w\-/]+\.py)\b")
+
+RULES = {
+    "GitAnalyser": re.compile(r"\b(commits?|committed|history|changelog|diffs?|authors?|blame)\b", re.I),
+    "CodeQualityAnalyzer": re.compile(r"\b(quality|lint|pylint|complexity|code smells?|style issues)\b", re.I),
+    "CodeReader": re.compile(r"\b(explain|what does|how does|walk me through|read|summari[sz]e)\b", re.I),
+    "ResumeReviewer": re.compile(r"\b(resume|cv|experience|skills|worked at|employment|career)\b", re.I),
+}
+
+class Route:
+    """Routing decision: which tool to call directly and with what arguments"""
+
+    def __init__(self, tool: str, args: Dict, reason: str, score: float = 1.0):
+        self.tool = tool
+        self.args = args
+        self.reason = reason
+        self.score = score
+
+    def __repr__(self):
+        return f"Route(tool={self.tool!r}, args={self.args!r}, reason={self.reason!r}, score={self.score:.2f})"
+
+def parse_relative_dates(question: str) -> Dict:
+    """Turn phrases like 'last week' or 'past 3 days' into a start_date"""
+    now = datetime.now()
+    text = question.lower()
+    match = re.search(r"\b(?:last|past)\s+(\d+)\s+(day|week|month)s?\b", text)
+    if match:
+        days = int(match.group(1)) * {"day": 1, "week": 7, "month": 30}[match.group(2)]
+    elif "yesterday" in text:
+        days = 1
+    elif re.search(r"\b(last|past|this) week\b", text):
+        days = 7
+    elif re.search(r"\b(last|past|this) month\b", text):
+        days = 30
+    elif re.search(r"\b(last|past|this) year\b", text):
+        days = 365
+    else:
+        return {}
+    return {"start_date": (now - timedelta(days=days)).isoformat()}
+
+class QueryRouter:
+    """
+    Rule- and embedding-based intent classifier in front of the agent. A
+    question that clearly targets one tool, with that tool's required
+    arguments present, is dispatched straight to it, skipping the ReAct
+    round-trips used to pick the tool and rephrase its output.
+    """
+
+    def __init__(self, resume_query_engine=None, descriptions: Optional[Dict[str, str]] = None):
+        self.resume_query_engine = resume_query_engine
+        self.descriptions = descriptions or {}
+        self._description_embeddings = None
+
+    def _extract_args(self, tool: str, question: str) -> Optional[Dict]:
+        """Arguments for ``tool`` taken from the question, or None if a required one is missing"""
+        if tool == "GitAnalyser":
+            repo_url = REPO_URL.search(question)
+            if not repo_url:
+                return None
+            return {"query": question, "repo_url": repo_url.group(1).rstrip(".,?!)"),
+                    **parse_relative_dates(question)}
+        if tool == "CodeQualityAnalyzer":
+            files = FILE_NAME.findall(question)
+            return {"file_name": ",".join(files)} if files else None
+        if tool == "CodeReader":
+            files = FILE_NAME.findall(question)
+            if len(files) != 1 and not re.search(r"\b(uploaded|this) (code|file)\b", question, re.I):
+                return None
+            # An empty file name means the session's latest upload
+            return {"file_name": files[0] if files else "", "query": question}
+        if tool == "ResumeReviewer":
+            return {"query": question} if self.resume_query_engine is not None else None
+        return None
+
+    def _embedding_scores(self, question: str) -> List:
+        embed_model = get_embed_model()
+        if self._description_embeddings is None:
+            self._description_embeddings = {
+                tool: embed_model.get_text_embedding(description)
+                for tool, description in self.descriptions.items()
+            }
+        query_embedding = embed_model.get_query_embedding(question)
+        scores = [(embed_model.similarity(query_embedding, embedding), tool)
+                  for tool, embedding in self._description_embeddings.items()]
+        return sorted(scores, reverse=True)
+
+    def route(self, question: str) -> Optional[Route]:
+        """Pick a single tool for the question, or None to fall back to the agent"""
+        with span("router.route") as attrs:
+            matched = [tool for tool, rule in RULES.items() if rule.search(question)]
+            route = None
+            if len(matched) == 1:
+                args = self._extract_args(matched[0], question)
+                if args is not None:
+                    route = Route(matched[0], args, "rule")
+            elif self.descriptions:
+                scores = self._embedding_scores(question)
+                best, tool = scores[0]
+                runner_up = scores[1][0] if len(scores) > 1 else 0.0
+                # With several rules firing, the embedding may only pick among them
+                if (best >= EMBED_THRESHOLD and best - runner_up >= EMBED_MARGIN
+                        and (not matched or tool in matched)):
+                    args = self._extract_args(tool, question)
+                    if args is not None:
+                        route = Route(tool, args, "embedding", best)
+
+            attrs["tool"] = route.tool if route else "agent"
+            logger.info("Routing decision for %r: %s (rules matched: %s)", question[:80], route or "agent", matched)
+            count(f"router_{route.tool if route else 'agent'}")
+            return route
+
+    @traced("router.dispatch")
+    def dispatch(self, route: Route) -> Optional[str]:
+        """Call the routed tool. Returns None if it failed, so the agent can take over."""
+        if route.tool == "GitAnalyser":
+            result = git_query(**route.args)
+            text = result.get("response", "")
+            return None if text.startswith("Error analyzing repository") else text
+        if route.tool == "CodeQualityAnalyzer":
+            result = code_quality_tool_func(**route.args)
+            return None if "error" in result else result["pylint_report"]
+        if route.tool == "CodeReader":
+            result = code_reader_func(**route.args)
+            return None if "error" in result else str(result["explanation"])
+        if route.tool == "ResumeReviewer":
+            try:
+                return str(self.resume_query_engine.query(route.args["query"]).response)
+            except Exception as e:
+                logger.warning("ResumeReviewer failed, falling back to the agent: %s", e)
+                return None
+        return None
@@ -0,0 +1,90 @@
+# tests/test_code_explainer.py
+
+import threading
+
+import pytest
+
+pytest.importorskip("llama_index.core")
+
+from tools import code_explainer
+from tools.ingestion import TextCache
+
+class FakeLLM:
+    """Returns a fixed-size reply and counts the prompts it was sent"""
+
+    def __init__(self, reply_chars: int = 50):
+        self.reply_chars = reply_chars
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def complete(self, prompt: str) -> str:
+        with self._lock:
+            self.prompts.append(prompt)
+            return str(len(self.prompts)) * self.reply_chars
+
+@pytest.fixture
+def fake_llm(monkeypatch, tmp_path):
+    llm = FakeLLM()
+    monkeypatch.setattr(code_explainer, "_llm", llm)
+    monkeypatch.setattr(code_explainer, "explanation_cache", TextCache(str(tmp_path)))
+    return llm
+
+SOURCE = '''# example.py
+import os
+
+CONSTANT = 1
+
+@decorator
+def first():
+    return 1
+
+class Second:
+    def method(self):
+        return 2
+
+print(first())
+'''
+
+def test_split_into_chunks_by_top_level_definition():
+    chunks = code_explainer.split_into_chunks(SOURCE)
+
+    assert [name for name, _ in chunks] == [
+        "module code (lines 2-5)",
+        "function first (lines 6-8)",
+        "class Second (lines 10-12)",
+        "module code (lines 14-14)",
+    ]
+    assert chunks[1][1].startswith("@decorator")
+
+def test_split_into_chunks_bounds_chunk_size(monkeypatch):
+    monkeypatch.setattr(code_explainer, "MAX_CHUNK_CHARS", 100)
+    source = "def big():\n" + "".join(f"    x{i} = {i}\n" for i in range(100))
+
+    chunks = code_explainer.split_into_chunks(source)
+
+    assert len(chunks) > 1
+    assert all(len(code) <= 100 for _, code in chunks)
+    assert "\n".join(code for _, code in chunks) == source.rstrip("\n")
+
+def test_split_into_chunks_falls_back_on_syntax_error():
+    assert code_explainer.split_into_chunks("def (:\n  broken") == [("code (lines 1-2)", "def (:\n  broken")]
+
+def test_reduce_terminates_with_long_explanations(fake_llm):
+    # Replies longer than half the reduce limit must not stall the reduction
+    fake_llm.reply_chars = code_explainer.MAX_REDUCE_CHARS
+
+    summary = code_explainer._reduce("a.py", ["Y" * 3000] * 8)
+
+    assert summary
+    assert all(len(prompt) < 2 * code_explainer.MAX_REDUCE_CHARS for prompt in fake_llm.prompts)
+
+def test_explain_code_reuses_cached_chunks(fake_llm):
+    code_explainer.explain_code(SOURCE, file_name="example.py")
+    first_run = len(fake_llm.prompts)
+
+    edited = SOURCE.replace("return 2", "return 3")
+    code_explainer.explain_code(edited, file_name="example.py")
+
+    # Only the edited class and the final reduction run again
+    assert first_run == 5
+    assert len(fake_llm.prompts) == first_run + 2
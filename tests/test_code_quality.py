@@ -0,0 +1,82 @@
+# tests/test_code_quality.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("pylint")
+pytest.importorskip("llama_index.core")
+
+from tools.code_quality import CodeQualityAnalyzer
+
+SOURCE = "import os\n\ndef f(x):\n    if x:\n        return os.sep\n    return  1\n"
+
+@pytest.fixture
+def python_files(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"module_{i}.py"
+        path.write_text(SOURCE)
+        paths.append(str(path))
+    return paths
+
+def test_concurrent_in_process_checks_keep_their_own_messages(python_files):
+    analyzer = CodeQualityAnalyzer(max_workers=1)
+
+    with ThreadPoolExecutor(max_workers=len(python_files)) as pool:
+        results = list(pool.map(lambda path: analyzer.analyze_files([path]), python_files))
+
+    for path, result in zip(python_files, results):
+        assert result["pylint"]
+        assert {message["path"] for message in result["pylint"]} == {path}
+
+def test_analyze_files_reuses_cached_results(python_files):
+    analyzer = CodeQualityAnalyzer(max_workers=1)
+    first = analyzer.analyze_files(python_files[:2])
+
+    assert analyzer.analyze_files(python_files[:2]) == first
+    assert len(analyzer.cache) == 2
+
+@pytest.mark.parametrize("directory", ["/", "..", "src/../../elsewhere"])
+def test_project_scan_rejects_directories_outside_the_root(monkeypatch, tmp_path, directory):
+    from tools import code_quality
+
+    monkeypatch.setattr(code_quality, "SCAN_ROOT", str(tmp_path / "project"))
+    result = code_quality.project_quality_scan(directory)
+
+    assert result["error"].startswith("Only directories inside the project")
+
+def test_project_scan_reports_progress(monkeypatch, tmp_path, python_files):
+    from tools import code_quality
+    from tracing import start_trace
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(code_quality, "SCAN_ROOT", str(tmp_path))
+    monkeypatch.setattr(code_quality, "code_quality_analyzer", CodeQualityAnalyzer(max_workers=1))
+    progress = []
+
+    with start_trace(on_progress=lambda message, done, total: progress.append((done, total))):
+        result = code_quality.project_quality_scan(".")
+
+    assert result["files_analyzed"] == len(python_files)
+    assert progress == [(i + 1, len(python_files)) for i in range(len(python_files))]
+
+def test_tool_func_combines_comma_separated_files(monkeypatch, python_files):
+    from tools import code_quality
+
+    monkeypatch.setattr(code_quality, "code_quality_analyzer", CodeQualityAnalyzer(max_workers=1))
+    result = code_quality.code_quality_tool_func(file_name=", ".join(python_files[:2]))
+
+    assert {message["path"] for message in result["raw_results"]["pylint"]} == set(python_files[:2])
+    assert "# Code Quality Report" in result["pylint_report"]
+
+def test_reused_linter_matches_first_run_and_sees_edits(tmp_path, python_files):
+    analyzer = CodeQualityAnalyzer(max_workers=1)
+    first = analyzer.run_pylint(python_files[0])
+    second = analyzer.run_pylint(python_files[1])
+
+    assert [m["symbol"] for m in first] == [m["symbol"] for m in second]
+
+    with open(python_files[1], "w") as f:
+        f.write('"""Module."""\n')
+    assert analyzer.run_pylint(python_files[1]) == []
@@ -0,0 +1,57 @@
+# tests/test_context_packing.py
+
+import pytest
+
+pytest.importorskip("llama_index.core")
+
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+
+from tools.context_packing import NearDuplicateFilter, TokenBudgetPacker
+
+def nodes(*texts):
+    return [NodeWithScore(node=TextNode(text=text), score=1.0 - i / 10) for i, text in enumerate(texts)]
+
+def test_packer_sends_at_most_top_n_chunks():
+    packer = TokenBudgetPacker(token_budget=1000, max_chunk_tokens=300, top_n=3)
+    retrieved = nodes(*(f"chunk number {i} about parsing options" for i in range(12)))
+
+    packed = packer.postprocess_nodes(retrieved, QueryBundle("parsing"))
+
+    assert [node.node.get_content() for node in packed] == [f"chunk number {i} about parsing options" for i in range(3)]
+    report = packer.last_report
+    assert report["chunks_in"] == 12 and report["chunks_out"] == 3
+    # The nine chunks cut by top_n are saved; the three sent were not truncated
+    assert report["tokens_truncated"] == 0
+    assert report["tokens_saved"] == report["tokens_in"] - report["tokens_out"]
+    assert report["tokens_saved"] == 3 * report["tokens_out"]
+
+def test_packer_truncates_long_chunks_around_query_terms():
+    long_chunk = "\n".join(f"line {i} filler text" for i in range(200)) + "\nthe parser handles options here"
+    packer = TokenBudgetPacker(token_budget=200, max_chunk_tokens=100, top_n=3)
+
+    packed = packer.postprocess_nodes(nodes(long_chunk), QueryBundle("parser options"))
+
+    assert "the parser handles options here" in packed[0].node.get_content()
+    assert 0 < packer.last_report["tokens_out"] <= 100
+    assert packer.last_report["tokens_saved"] == packer.last_report["tokens_truncated"] > 0
+
+def test_near_duplicates_are_dropped():
+    text = "def parse(options): return options.get('value', None) if options else None"
+    kept = NearDuplicateFilter().postprocess_nodes(nodes(text, text + " ", "something else entirely"))
+
+    assert [node.node.get_content() for node in kept] == [text, "something else entirely"]
+
+def test_tokens_saved_metric_covers_duplicates_and_packing():
+    from tools.context_packing import count_tokens
+    from tracing import start_trace
+
+    text = "def parse(options): return options.get('value', None) if options else None"
+    retrieved = nodes(text, text + " ", *(f"chunk number {i} about parsing options" for i in range(5)))
+    packer = TokenBudgetPacker(token_budget=1000, max_chunk_tokens=300, top_n=3)
+
+    with start_trace() as trace:
+        packed = packer.postprocess_nodes(NearDuplicateFilter().postprocess_nodes(retrieved), QueryBundle("parsing"))
+
+    sent = sum(count_tokens(node.node.get_content()) for node in packed)
+    total = sum(count_tokens(node.node.get_content()) for node in retrieved)
+    assert trace.counters["context_tokens_saved"] == total - sent
@@ -0,0 +1,48 @@
+# tests/test_parallel_agent.py
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("llama_index.core")
+
+from llama_index.core.tools import FunctionTool
+from parallel_agent import ParallelToolAgent
+
+class FakeLLM:
+    def __init__(self, *replies: str):
+        self.replies = list(replies)
+
+    def complete(self, prompt: str):
+        return SimpleNamespace(text=self.replies.pop(0))
+
+class FakeAgent:
+    def query(self, question: str):
+        return SimpleNamespace(response="fallback", sources=[])
+
+def read_file(file_name: str) -> str:
+    """Read a file"""
+    return f"contents of {file_name}"
+
+def make_agent(*replies: str) -> ParallelToolAgent:
+    tool = FunctionTool.from_defaults(fn=read_file, name="CodeReader")
+    return ParallelToolAgent([tool], FakeLLM(*replies), fallback_agent=FakeAgent())
+
+def test_plan_keeps_calls_with_argument_objects():
+    agent = make_agent('[{"tool": "CodeReader", "input": {"file_name": "a.py"}}]')
+    assert agent.plan("q") == [{"tool": "CodeReader", "input": {"file_name": "a.py"}}]
+
+def test_plan_drops_calls_with_non_object_input():
+    agent = make_agent('[{"tool": "CodeReader", "input": "a.py"}, {"tool": "Unknown", "input": {}}]')
+    assert agent.plan("q") == []
+
+def test_query_falls_back_when_plan_is_unusable():
+    agent = make_agent('[{"tool": "CodeReader", "input": "a.py"}]')
+    assert agent.query("q").response == "fallback"
+
+def test_query_answers_from_tool_outputs():
+    agent = make_agent('[{"tool": "CodeReader", "input": {"file_name": "a.py"}}]',
+                       "Thought: done\nFinal Answer: it reads a.py")
+    result = agent.query("q")
+    assert result.response == "it reads a.py"
+    assert result.sources[0].content == "contents of a.py"
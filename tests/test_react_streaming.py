@@ -0,0 +1,167 @@
+# tests/test_react_streaming.py
+
+import pytest
+
+pytest.importorskip("llama_index.llms.ollama")
+
+from llama_index.core.base.llms.types import ChatMessage
+from llama_index.core.callbacks import CallbackManager
+
+from llama_index.core.agent.react.types import ActionReasoningStep, ResponseReasoningStep
+
+from benchmarks.fake_ollama import FakeOllamaServer
+from react_streaming import CustomReActOutputParser, EarlyStopOllama, ReActStreamParser
+from tracing import start_trace
+from tracing_callbacks import TracingCallbackHandler
+
+def feed_in_chunks(text: str, size: int) -> ReActStreamParser:
+    """Feed text in fixed-size chunks, stopping where the parser reports the step complete"""
+    parser = ReActStreamParser()
+    for i in range(0, len(text), size):
+        if parser.feed(text[i:i + size]):
+            break
+    return parser
+
+CHUNK_SIZES = [1, 2, 3, 7, 10000]
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_markers_split_across_chunks(size):
+    text = 'Thought: read the file\nAction: CodeReader\nAction Input: {"file_name": "a.py"}\nmore'
+
+    parser = feed_in_chunks(text, size)
+    step = parser.result()
+
+    assert parser.complete
+    assert isinstance(step, ActionReasoningStep)
+    assert step.thought == "read the file"
+    assert step.action == "CodeReader"
+    assert step.action_input == {"file_name": "a.py"}
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_braces_and_escaped_quotes_inside_json_strings(size):
+    action_input = '{"query": "what do } and { and \\"}\\" mean?", "file_name": "a.py"}'
+    text = f"Thought: t\nAction: CodeReader\nAction Input: {action_input} trailing"
+
+    step = feed_in_chunks(text, size).result()
+
+    assert step.action_input == {"query": 'what do } and { and "}" mean?', "file_name": "a.py"}
+
+def test_action_input_is_incomplete_until_its_closing_brace():
+    parser = ReActStreamParser()
+    assert not parser.feed('Thought: t\nAction: CodeReader\nAction Input: {"file_name": "a.py", "q": "}')
+    assert not parser.feed('x"')
+    assert parser.feed("}")
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_plain_text_action_input_ends_with_its_line(size):
+    text = "Thought: t\nAction: CodeReader\nAction Input: a.py\nThought: ignored"
+
+    parser = feed_in_chunks(text, size)
+
+    assert parser.complete
+    assert parser.result().action_input == {"input": "a.py"}
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_final_answer(size):
+    step = feed_in_chunks("Thought: I know this.\nFinal Answer: 42 files", size).result()
+
+    assert isinstance(step, ResponseReasoningStep)
+    assert step.thought == "I know this."
+    assert step.response == "42 files"
+
+def test_answer_without_markers_is_implicit():
+    step = CustomReActOutputParser().parse("Just an answer.")
+    assert isinstance(step, ResponseReasoningStep)
+    assert step.response == "Just an answer."
+
+def test_action_none_uses_the_observation_as_answer():
+    step = CustomReActOutputParser().parse("Thought: t\nAction: None\nAction Input: {}\nObservation: plain answer")
+    assert isinstance(step, ResponseReasoningStep)
+    assert step.response == "plain answer"
+
+def test_action_none_without_observation():
+    step = CustomReActOutputParser().parse("Thought: t\nAction: None\nAction Input: {}")
+    assert step.response == "No additional observations provided."
+
+def test_json_observation_response_is_the_answer():
+    output = ('Thought: t\nAction: CodeReader\nAction Input: {"file_name": "a.py"}\n'
+              'Observation: {"response": "It parses options."}')
+    step = CustomReActOutputParser().parse(output)
+    assert isinstance(step, ResponseReasoningStep)
+    assert step.response == "It parses options."
+
+def test_action_without_input_cannot_be_parsed():
+    with pytest.raises(ValueError, match="Could not parse output"):
+        CustomReActOutputParser().parse("Thought: t\nAction: CodeReader")
+
+class ScriptedOllamaServer(FakeOllamaServer):
+    def __init__(self, text: str):
+        super().__init__()
+        self.text = text
+
+    def reply(self, prompt: str, last_message: str = "") -> str:
+        return self.text
+
+@pytest.fixture
+def llm_for():
+    servers = []
+
+    def make(text: str):
+        server = ScriptedOllamaServer(text).start()
+        servers.append(server)
+        handler = TracingCallbackHandler()
+        llm = EarlyStopOllama(model="fake", base_url=server.base_url,
+                              callback_manager=CallbackManager([handler]))
+        return llm, handler
+
+    yield make
+    for server in servers:
+        server.stop()
+
+@pytest.mark.parametrize("text", [
+    "Thought: done\nAnswer: all good",
+    'Thought: use a tool\nAction: CodeReader\nAction Input: {"file_name": "a.py"}\nand then some more text',
+])
+def test_chat_is_one_llm_span_with_token_counts(llm_for, text):
+    llm, handler = llm_for(text)
+
+    with start_trace() as trace:
+        response = llm.chat([ChatMessage(role="user", content="question here")])
+
+    summary = trace.to_dict()
+    assert summary["stages"]["llm"]["count"] == 1
+    assert summary["counters"]["llm_tokens_out"] <= len(text.split(" ")) + 1
+    assert handler._starts == {}
+    assert response.message.content.startswith("Thought:")
+
+def test_chat_stops_after_complete_action(llm_for):
+    llm, _ = llm_for('Thought: t\nAction: CodeReader\nAction Input: {"file_name": "a.py"} trailing words here')
+
+    response = llm.chat([ChatMessage(role="user", content="q")])
+
+    assert "trailing" not in response.message.content
+
+def test_fake_server_drives_a_tool_call_through_react_agent():
+    from llama_index.core.agent import ReActAgent
+    from llama_index.core.tools import FunctionTool
+    from react_streaming import CustomReActOutputParser
+
+    calls = []
+
+    def code_reader(file_name: str, query: str = None) -> str:
+        """Read a code file"""
+        calls.append(file_name)
+        return "it defines functions"
+
+    server = FakeOllamaServer(tool_file="a.py").start()
+    try:
+        llm = EarlyStopOllama(model="fake", base_url=server.base_url)
+        tool = FunctionTool.from_defaults(fn=code_reader, name="CodeReader")
+        agent = ReActAgent.from_tools([tool], llm=llm, output_parser=CustomReActOutputParser(),
+                                      context="You review code.")
+        response = agent.query("What does a.py do?")
+    finally:
+        server.stop()
+
+    assert calls == ["a.py"]
+    assert "synthetic benchmark functions" in str(response)
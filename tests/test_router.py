@@ -0,0 +1,23 @@
+# tests/test_router.py
+
+import pytest
+
+pytest.importorskip("llama_index.core")
+
+from router import QueryRouter, Route
+
+class FailingQueryEngine:
+    def query(self, query: str):
+        raise TimeoutError("Ollama timed out")
+
+def test_rule_routes_resume_question():
+    route = QueryRouter(resume_query_engine=object()).route("What skills are on my resume?")
+    assert route.tool == "ResumeReviewer"
+    assert route.args == {"query": "What skills are on my resume?"}
+
+def test_ambiguous_question_goes_to_the_agent():
+    assert QueryRouter().route("Explain the commit history of my resume") is None
+
+def test_resume_failure_falls_back_to_the_agent():
+    router = QueryRouter(resume_query_engine=FailingQueryEngine())
+    assert router.dispatch(Route("ResumeReviewer", {"query": "skills?"}, "rule")) is None
@@ -0,0 +1,36 @@
+# tests/test_uploads.py
+
+import pytest
+
+pytest.importorskip("llama_index.core")
+
+from tools import code_reader
+from tools.uploads import UploadStore, use_upload_session
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    store = UploadStore(upload_dir=str(tmp_path))
+    report = tmp_path / "report.pdf"
+    report.write_bytes(b"%PDF")
+    store.sessions["s1"] = {"index": None, "files": {
+        "d1": {"name": "report.pdf", "path": str(report), "digest": "d1",
+               "status": "ready", "error": None, "uploaded_at": 1.0},
+    }}
+    monkeypatch.setattr(code_reader, "upload_store", store)
+    return store
+
+def test_resolve_by_name_and_latest(store):
+    assert store.resolve("s1", "report.pdf").endswith("report.pdf")
+    assert store.resolve("s1", "") == store.resolve("s1", "report.pdf")
+    assert store.resolve("s1", "missing.py") is None
+    assert store.resolve(None, "") is None
+
+def test_code_reader_does_not_swap_a_missing_file_for_the_latest_upload(store):
+    with use_upload_session("s1"):
+        result = code_reader.code_reader_func("foo.py")
+    assert "error" in result and "foo.py" in result["error"]
+
+def test_pending_lists_uploads_still_indexing(store):
+    assert store.pending("s1") == []
+    store.sessions["s1"]["files"]["d1"]["status"] = "indexing"
+    assert [record["name"] for record in store.pending("s1")] == ["report.pdf"]
@@ -1,17 +1,139 @@
 # tools/code_explainer.py
 
-from llama_index.llms.ollama import Ollama
-
-def explain_code(code_snippet: str) -> str:
-    print("[DEBUG] Running explain_code with code snippet")
-    
-    llm = Ollama(model="llama3.2:3b-instruct-q6_K", request_timeout=500)
-    prompt = f"Explain the following code snippet in simple terms: \n\n{code_snippet}"
-    
-    print("[DEBUG] Prompt sent to LLM")
-    
-    explanation = llm.complete(prompt)
-    
-    print("[DEBUG] Explanation returned from LLM")
-    
-    return explanation
+from concurrent.futures import ThreadPoolExecutor
+from tools.ingestion import TextCache
+from tools.models import LLM_MODEL_NAME, get_llm
+from prompts import chunk_explain_template, explain_reduce_template
+from tracing import record_cache, traced
+import ast
+import contextvars
+import hashlib
+import logging
+import os
+import threading
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Largest piece of code sent in one prompt, and largest set of explanations reduced at once
+MAX_CHUNK_CHARS = 6000
+MAX_REDUCE_CHARS = 8000
+EXPLAIN_WORKERS = int(os.getenv("EXPLAIN_WORKERS", "4"))
+
+explanation_cache = TextCache(".explain_cache")
+
+_llm = None
+_llm_lock = threading.Lock()
+
+def _get_llm():
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            _llm = get_llm()
+    return _llm
+
+def _split_lines(name: str, lines: List[str], start: int) -> List[Tuple[str, str]]:
+    """Split an oversized block into pieces of at most MAX_CHUNK_CHARS"""
+    pieces, current, size, first = [], [], 0, start
+    for offset, line in enumerate(lines):
+        if current and size + len(line) + 1 > MAX_CHUNK_CHARS:
+            pieces.append((f"{name} (lines {first}-{start + offset - 1})", "\n".join(current)))
+            current, size, first = [], 0, start + offset
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        pieces.append((f"{name} (lines {first}-{start + len(lines) - 1})", "\n".join(current)))
+    return pieces
+
+def split_into_chunks(code: str) -> List[Tuple[str, str]]:
+    """
+    Split source into (name, code) chunks: one per top-level function or
+    class, with the module-level statements between them grouped together.
+    Falls back to fixed-size line blocks when the code doesn't parse.
+    """
+    lines = code.splitlines()
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return _split_lines("code", lines, 1)
+
+    chunks, pending_start = [], None
+
+    def flush_module_code(end: int):
+        if pending_start is not None and any(l.strip() for l in lines[pending_start - 1:end]):
+            chunks.extend(_split_lines("module code", lines[pending_start - 1:end], pending_start))
+
+    for node in tree.body:
+        start = min([d.lineno for d in getattr(node, "decorator_list", [])] + [node.lineno])
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            flush_module_code(start - 1)
+            pending_start = None
+            kind = "class" if isinstance(node, ast.ClassDef) else "function"
+            chunks.extend(_split_lines(f"{kind} {node.name}", lines[start - 1:node.end_lineno], start))
+        elif pending_start is None:
+            pending_start = start
+    flush_module_code(len(lines))
+    return chunks
+
+def _cached_complete(prompt: str) -> str:
+    """Run a prompt through the LLM, reusing the stored answer for an identical prompt"""
+    key = hashlib.sha256(f"{LLM_MODEL_NAME}\0{prompt}".encode("utf-8")).hexdigest()
+    cached = explanation_cache.get(key)
+    record_cache("explanation", cached is not None)
+    if cached is not None:
+        return cached
+    text = str(_get_llm().complete(prompt)).strip()
+    explanation_cache.put(key, text)
+    return text
+
+def _map(prompts: List[str]) -> List[str]:
+    """Complete prompts concurrently, keeping their order"""
+    if len(prompts) == 1:
+        return [_cached_complete(prompts[0])]
+    with ThreadPoolExecutor(max_workers=min(EXPLAIN_WORKERS, len(prompts))) as pool:
+        # Copy the context so spans and cache counts join the current trace
+        futures = [pool.submit(contextvars.copy_context().run, _cached_complete, prompt) for prompt in prompts]
+        return [future.result() for future in futures]
+
+def _reduce(file_name: str, explanations: List[str]) -> str:
+    """Combine explanations, in groups small enough for one prompt, until one is left"""
+    while len(explanations) > 1:
+        # Capping each explanation at half the limit puts at least two in every
+        # group, so each round strictly shortens the list
+        explanations = [explanation[:MAX_REDUCE_CHARS // 2] for explanation in explanations]
+        groups, current, size = [], [], 0
+        for explanation in explanations:
+            if current and size + len(explanation) > MAX_REDUCE_CHARS:
+                groups.append(current)
+                current, size = [], 0
+            current.append(explanation)
+            size += len(explanation)
+        groups.append(current)
+        explanations = _map([
+            explain_reduce_template.format(file_name=file_name, explanations="\n\n".join(group))
+            for group in groups
+        ])
+    return explanations[0]
+
+@traced("code.explain")
+def explain_code(code_snippet: str, file_name: str = "the file") -> str:
+    """
+    Explain code by explaining each function/class chunk concurrently and
+    reducing the results into one summary. Every LLM answer is cached by a
+    hash of its prompt, so after a small edit only the changed chunks and the
+    final reduction run again, and no prompt exceeds the chunk size limits.
+    """
+    chunks = split_into_chunks(code_snippet)
+    if not chunks:
+        return "The file is empty."
+
+    chunk_explanations = _map([
+        chunk_explain_template.format(file_name=file_name, chunk_name=name, code=code)
+        for name, code in chunks
+    ])
+    logger.debug("Explained %s in %d chunks", file_name, len(chunks))
+
+    labelled = [f"{name}:\n{explanation}" for (name, _), explanation in zip(chunks, chunk_explanations)]
+    if len(labelled) == 1:
+        return chunk_explanations[0]
+    return _reduce(file_name, labelled)
@@ -1,44 +1,303 @@
 # tools/code_quality.py
 
-import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from llama_index.core.tools import FunctionTool
+from tools.uploads import current_upload_session, upload_store
+from tracing import count, record_cache, report_progress, traced
+import hashlib
+import multiprocessing
 import os
 import json
-from typing import Dict, List
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MANIFEST_DIR = ".quality_cache"
+# Only trees under this root (the project, including data/) may be scanned
+SCAN_ROOT = os.path.realpath(os.getenv("QUALITY_SCAN_ROOT", "."))
+SKIP_DIRS = {".git", "__pycache__", ".venv", "venv", "node_modules", ".tox", ".nox", MANIFEST_DIR}
 
 class CodeQualityAnalyzer:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
         self.metrics = {
             "error": "🔴",
             "warning": "🟡",
             "convention": "🔵",
             "refactor": "🟣"
         }
-    
-    def run_pylint(self, file_path: str) -> str:
-        """Run pylint and get the output"""
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = {}  # Map of (file_path, content_hash) -> analysis results
+        self._linter = None
+        self._linter_lock = threading.Lock()  # One PyLinter (and astroid cache) shared by every session
+        self._pool = None
+
+    def _check(self, file_path: str, reporter):
+        """Lint one file, creating the pylint linter on the first call and reusing it afterwards"""
+        if self._linter is None:
+            from pylint.lint import Run
+
+            # Run reads the same configuration as the CLI (pylintrc, pyproject.toml)
+            # but needs a file to lint, so the first file goes through it
+            run = Run(["--disable=I", "--reports=n", "--score=n", "--persistent=n", file_path],
+                      reporter=reporter, exit=False)
+            self._linter = run.linter
+            return
+        self._linter.set_reporter(reporter)
+        self._forget_module(file_path)
+        self._linter.check([file_path])
+
+    def _forget_module(self, file_path: str):
+        """Drop a file's cached AST so pylint sees its current content"""
+        from astroid import MANAGER
+
+        abs_path = os.path.abspath(file_path)
+        stale = [name for name, module in MANAGER.astroid_cache.items()
+                 if module.file and os.path.abspath(module.file) == abs_path]
+        for name in stale:
+            del MANAGER.astroid_cache[name]
+
+    @traced("quality.pylint")
+    def run_pylint(self, file_path: str) -> List[Dict]:
+        """Run pylint in-process and get the messages as JSON-style dicts"""
         try:
-            result = subprocess.run(
-                ["pylint", "--output-format=json", file_path],
-                capture_output=True,
-                text=True
-            )
-            return result.stdout
+            from pylint.reporters import CollectingReporter
+
+            reporter = CollectingReporter()
+            with self._linter_lock:
+                self._check(file_path, reporter)
+            return [
+                {
+                    "type": msg.category,
+                    "module": msg.module,
+                    "obj": msg.obj,
+                    "line": msg.line,
+                    "column": msg.column,
+                    "endLine": msg.end_line,
+                    "endColumn": msg.end_column,
+                    "path": msg.path,
+                    "symbol": msg.symbol,
+                    "message": msg.msg,
+                    "message-id": msg.msg_id,
+                }
+                for msg in reporter.messages
+            ]
         except Exception as e:
-            return json.dumps([{"message": f"Error running pylint: {str(e)}"}])
-    
+            return [{"message": f"Error running pylint: {str(e)}"}]
+
+    @traced("quality.radon")
     def analyze_complexity(self, file_path: str) -> Dict:
         """Analyze code complexity using radon"""
         try:
-            result = subprocess.run(
-                ["radon", "cc", "--json", file_path],
-                capture_output=True,
-                text=True
-            )
-            return json.loads(result.stdout)
+            from radon.complexity import cc_visit, sorted_results
+            from radon.cli.tools import cc_to_dict
+
+            with open(file_path, "r", encoding="utf-8") as f:
+                blocks = sorted_results(cc_visit(f.read()))
+            return {file_path: [cc_to_dict(block) for block in blocks]}
         except Exception as e:
             return {"error": str(e)}
-    
+
+    def _content_key(self, file_path: str) -> Tuple[str, str]:
+        """Cache key for a file: its path plus a hash of its current content"""
+        with open(file_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        return os.path.abspath(file_path), digest
+
+    def _analyze_uncached(self, file_path: str) -> Dict:
+        return {
+            "pylint": self.run_pylint(file_path),
+            "complexity": self.analyze_complexity(file_path)
+        }
+
+    def analyze_file(self, file_path: str) -> Dict:
+        """Run pylint and radon on a single file, reusing cached results"""
+        key = self._content_key(file_path)
+        record_cache("quality", key in self.cache)
+        if key not in self.cache:
+            self.cache[key] = self._analyze_uncached(file_path)
+        return self.cache[key]
+
+    def analyze_files(self, file_paths: List[str]) -> Dict:
+        """
+        Analyze many files, spreading cache misses across a pool of worker
+        processes. Each worker keeps its own linter alive between calls.
+        """
+        keys = {path: self._content_key(path) for path in file_paths}
+        missing = [path for path in file_paths if keys[path] not in self.cache]
+        count("quality_cache_hits", len(file_paths) - len(missing))
+        count("quality_cache_misses", len(missing))
+
+        if len(missing) == 1 or self.max_workers == 1:
+            for path in missing:
+                self.cache[keys[path]] = self._analyze_uncached(path)
+        elif missing:
+            for path, results in self._get_pool().map(_analyze_in_worker, missing):
+                self.cache[keys[path]] = results
+
+        combined = {"pylint": [], "complexity": {}}
+        for path in file_paths:
+            results = self.cache[keys[path]]
+            combined["pylint"].extend(results["pylint"])
+            if "error" in results["complexity"]:
+                combined["complexity"][path] = results["complexity"]
+            else:
+                combined["complexity"].update(results["complexity"])
+        return combined
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawn rather than fork: the app process has threads and torch loaded
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def manifest_path(self, root: str) -> str:
+        """Location of the stored hash + result manifest for a scanned tree"""
+        root_id = hashlib.sha256(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(MANIFEST_DIR, f"{root_id}.json")
+
+    def load_manifest(self, root: str) -> Dict:
+        """Load the stored per-file results for a tree (empty if never scanned)"""
+        path = self.manifest_path(root)
+        if not os.path.exists(path):
+            return {"root": os.path.abspath(root), "files": {}}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self, root: str, manifest: Dict):
+        path = self.manifest_path(root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def find_python_files(self, root: str) -> List[str]:
+        """Walk a tree and collect its Python files, skipping VCS and virtualenv folders"""
+        file_paths = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+            for name in sorted(filenames):
+                if name.endswith(".py"):
+                    file_paths.append(os.path.join(dirpath, name))
+        return file_paths
+
+    def scan_directory(self, root: str) -> Iterator[Dict]:
+        """
+        Analyze every Python file under ``root``, yielding one result per file
+        as soon as it is available. Files whose content hash matches the stored
+        manifest are served from it without re-running analysis; the rest are
+        spread across the worker pool. The manifest is updated as results arrive.
+        """
+        manifest = self.load_manifest(root)
+        stored = manifest["files"]
+        file_paths = self.find_python_files(root)
+        total = len(file_paths)
+        done = 0
+
+        current = {}
+        missing = []
+        for path in file_paths:
+            rel_path = os.path.relpath(path, root)
+            key = self._content_key(path)
+            current[rel_path] = key[1]
+            entry = stored.get(rel_path)
+            if entry and entry["hash"] == key[1]:
+                self.cache.setdefault(key, entry["results"])
+            elif key in self.cache:
+                stored[rel_path] = {"hash": key[1], "results": self.cache[key]}
+            else:
+                missing.append(path)
+        count("quality_cache_hits", len(file_paths) - len(missing))
+        count("quality_cache_misses", len(missing))
+
+        # Forget files that no longer exist
+        for rel_path in list(stored):
+            if rel_path not in current:
+                del stored[rel_path]
+
+        try:
+            for path in file_paths:
+                rel_path = os.path.relpath(path, root)
+                if rel_path in stored and stored[rel_path]["hash"] == current[rel_path]:
+                    done += 1
+                    yield {"file": rel_path, "cached": True, "done": done, "total": total,
+                           "results": stored[rel_path]["results"]}
+
+            if len(missing) == 1 or self.max_workers == 1:
+                completed = (self._analyze_in_process(path) for path in missing)
+            else:
+                futures = [self._get_pool().submit(_analyze_in_worker, path) for path in missing]
+                completed = (future.result() for future in as_completed(futures))
+
+            for path, results in completed:
+                rel_path = os.path.relpath(path, root)
+                self.cache[(os.path.abspath(path), current[rel_path])] = results
+                stored[rel_path] = {"hash": current[rel_path], "results": results}
+                done += 1
+                yield {"file": rel_path, "cached": False, "done": done, "total": total,
+                       "results": results}
+        finally:
+            self.save_manifest(root, manifest)
+
+    def _analyze_in_process(self, file_path: str):
+        return file_path, self._analyze_uncached(file_path)
+
+    def summarize(self, manifest: Dict, top_n: int = 10) -> Dict:
+        """Aggregate stored results: issue counts by type and worst complexity hotspots"""
+        issue_counts = {}
+        hotspots = []
+        for rel_path, entry in manifest["files"].items():
+            results = entry["results"]
+            for issue in results["pylint"]:
+                issue_type = issue.get("type", "unknown")
+                issue_counts[issue_type] = issue_counts.get(issue_type, 0) + 1
+            for blocks in results["complexity"].values():
+                if not isinstance(blocks, list):
+                    continue
+                for block in blocks:
+                    if block.get("type") == "class":
+                        continue
+                    hotspots.append({
+                        "file": rel_path,
+                        "name": block.get("name", "Unknown"),
+                        "complexity": block.get("complexity", 0),
+                        "lineno": block.get("lineno"),
+                        "endline": block.get("endline"),
+                    })
+        hotspots.sort(key=lambda block: block["complexity"], reverse=True)
+        return {
+            "files": len(manifest["files"]),
+            "issue_counts": issue_counts,
+            "hotspots": hotspots[:top_n],
+        }
+
+    def format_summary(self, summary: Dict) -> str:
+        """Format project-wide aggregate metrics"""
+        report = f"# Project Quality Summary ({summary['files']} files)\n\n"
+
+        report += "## Issues by Type\n\n"
+        if not summary["issue_counts"]:
+            report += "No issues found! 🎉\n"
+        for issue_type, count in sorted(summary["issue_counts"].items(), key=lambda item: -item[1]):
+            emoji = self.metrics.get(issue_type, "❓")
+            report += f"- {emoji} {issue_type.title()}: {count}\n"
+
+        report += "\n## 🔥 Complexity Hotspots\n\n"
+        if not summary["hotspots"]:
+            report += "No functions found to analyze.\n"
+        for block in summary["hotspots"]:
+            report += (f"- **{block['name']}** in `{block['file']}`\n"
+                      f"  - Complexity: {block['complexity']}\n"
+                      f"  - Line numbers: {block['lineno']}-{block['endline']}\n")
+
+        return report
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
     def format_pylint_results(self, results: List[Dict]) -> str:
         """Format pylint results into a readable report"""
         if not results:
@@ -77,6 +336,10 @@ class CodeQualityAnalyzer:
         for file_path, functions in results.items():
             report += f"### File: `{os.path.basename(file_path)}`\n\n"
             
+            if isinstance(functions, dict) and "error" in functions:
+                report += f"Error analyzing complexity: {functions['error']}\n\n"
+                continue
+
             if not functions:
                 report += "No functions found to analyze.\n\n"
                 continue
@@ -93,23 +356,50 @@ class CodeQualityAnalyzer:
             
         return report
 
-def code_quality_tool_func(file_name: str) -> Dict:
-    """Analyze code quality using multiple metrics"""
+# Per-process analyzer used by the worker pool
+_worker_analyzer = None
+
+def _analyze_in_worker(file_path: str):
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = CodeQualityAnalyzer(max_workers=1)
+    return file_path, _worker_analyzer._analyze_uncached(file_path)
+
+# Global analyzer instance
+code_quality_analyzer = CodeQualityAnalyzer()
+
+def _resolve_path(file_name: str) -> str:
+    """A file under data/, or else the current session's upload with that name"""
     path = os.path.join("data", file_name)
-    analyzer = CodeQualityAnalyzer()
-    
+    if not os.path.isfile(path):
+        path = upload_store.resolve(current_upload_session.get(), file_name) or path
+    return path
+
+def code_quality_tool_func(file_name: str = None, directory: str = None) -> Dict:
+    """Analyze code quality using multiple metrics.
+
+    ``file_name`` may list several files separated by commas; they are
+    analyzed in parallel and combined into one report. Passing ``directory``
+    instead scans every Python file under it, re-analyzing only files that
+    changed since the last scan, and returns project-wide aggregates.
+    """
+    if directory:
+        return project_quality_scan(directory)
+    if not file_name:
+        return {"error": "Please provide a file name or a directory to scan"}
+
+    paths = [_resolve_path(name.strip()) for name in file_name.split(",") if name.strip()]
+    analyzer = code_quality_analyzer
+
     try:
-        # Run pylint analysis
-        pylint_output = analyzer.run_pylint(path)
-        pylint_results = json.loads(pylint_output) if pylint_output else []
-        
-        # Run complexity analysis
-        complexity_results = analyzer.analyze_complexity(path)
-        
+        results = analyzer.analyze_files(paths)
+        pylint_results = results["pylint"]
+        complexity_results = results["complexity"]
+
         # Format results
         report = analyzer.format_pylint_results(pylint_results)
         report += "\n" + analyzer.format_complexity_results(complexity_results)
-        
+
         return {
             "pylint_report": report,
             "raw_results": {
@@ -120,12 +410,53 @@ def code_quality_tool_func(file_name: str) -> Dict:
     except Exception as e:
         return {"error": f"Error analyzing code: {str(e)}"}
 
+def _resolve_directory(directory: str) -> Optional[str]:
+    """``directory`` resolved against SCAN_ROOT, or None if it points outside it"""
+    path = os.path.realpath(os.path.join(SCAN_ROOT, directory))
+    if os.path.commonpath([SCAN_ROOT, path]) != SCAN_ROOT:
+        return None
+    return path
+
+def project_quality_scan(directory: str, on_progress=None) -> Dict:
+    """
+    Scan a whole tree under SCAN_ROOT. Each per-file result goes to
+    ``on_progress`` if given, and file counts to the current trace's progress hook.
+    """
+    analyzer = code_quality_analyzer
+    path = _resolve_directory(directory)
+    if path is None:
+        return {"error": f"Only directories inside the project can be scanned: {directory}"}
+    if not os.path.isdir(path):
+        return {"error": f"Directory not found: {directory}"}
+    directory = path
+
+    try:
+        analyzed = 0
+        for file_result in analyzer.scan_directory(directory):
+            if not file_result["cached"]:
+                analyzed += 1
+            report_progress(f"Scanning {file_result['file']}", file_result["done"], file_result["total"])
+            if on_progress is not None:
+                on_progress(file_result)
+
+        summary = analyzer.summarize(analyzer.load_manifest(directory))
+        return {
+            "pylint_report": analyzer.format_summary(summary),
+            "summary": summary,
+            "files_analyzed": analyzed,
+            "files_cached": summary["files"] - analyzed
+        }
+    except Exception as e:
+        return {"error": f"Error scanning project: {str(e)}"}
+
 # Wrap as a FunctionTool for the agent
 code_quality_tool = FunctionTool.from_defaults(
     fn=code_quality_tool_func,
     name="CodeQualityAnalyzer",
     description=(
         "Analyzes Python code quality using multiple metrics including style, complexity, and best practices. "
-        "Provides detailed reports with suggestions for improvement."
+        "Provides detailed reports with suggestions for improvement. "
+        "Several files can be analyzed at once by separating their names with commas, "
+        "or a whole project can be scanned by passing a directory inside the project instead of a file name."
     )
-)
\ No newline at end of file
+)
@@ -2,17 +2,27 @@
 
 from llama_index.core.tools import FunctionTool
 from llama_index.core import Document, VectorStoreIndex
-from llama_index.core.embeddings import resolve_embed_model
-from llama_index.llms.ollama import Ollama
-from tools.code_explainer import explain_code
+from tools.code_explainer import explain_code, split_into_chunks
+from tools.context_packing import packed_query_engine
+from tools.uploads import current_upload_session, upload_store
+from tools.models import get_embed_model, get_llm
+from tracing import traced
 import os
 
+# Files longer than this are returned to the agent as an outline instead of in full
+MAX_RETURNED_CONTENT_CHARS = 4000
+
 class CodeVectorStore:
     def __init__(self):
-        self.embed_model = resolve_embed_model("local:BAAI/bge-m3")
-        self.llm = Ollama(model="llama3.2:3b-instruct-q6_K", request_timeout=500)
+        self.llm = get_llm()
         self.vector_stores = {}  # Map of filename -> VectorStoreIndex
         
+    @property
+    def embed_model(self):
+        """Shared embedding model, loaded the first time a file is indexed"""
+        return get_embed_model()
+
+    @traced("code.index")
     def process_file(self, file_path: str):
         """Creates vector embeddings for code file content"""
         with open(file_path, "r", encoding="utf-8") as f:
@@ -46,13 +56,14 @@ class CodeVectorStore:
         chunks = [chunk.strip() for chunk in content.split("\n\n") if chunk.strip()]
         return chunks
         
+    @traced("code.query")
     def query_code(self, file_path: str, query: str):
         """Query the vector store for relevant code sections"""
         if file_path not in self.vector_stores:
             return None
             
         vector_store = self.vector_stores[file_path]
-        query_engine = vector_store.as_query_engine(llm=self.llm)
+        query_engine = packed_query_engine(vector_store, self.llm)
         response = query_engine.query(query)
         
         return response.response
@@ -64,13 +75,12 @@ def code_reader_func(file_name: str, query: str = None):
     base_path = "data"
     path = os.path.join(base_path, file_name)
 
-    # Fallback to temp_code.py if file doesn't exist
-    if not os.path.exists(path):
-        fallback_file = os.path.join(base_path, "temp_code.py")
-        if os.path.exists(fallback_file):
-            path = fallback_file
-        else:
-            return {"error": f"Neither {file_name} nor temp_code.py found in {base_path}"}
+    # Fallback to this session's uploads if the file isn't in data/; an empty
+    # file name means its latest upload
+    if not os.path.isfile(path):
+        path = upload_store.resolve(current_upload_session.get(), file_name)
+        if path is None:
+            return {"error": f"{file_name} not found in {base_path} or in this session's uploads"}
     try:
         # Process file and get content
         content = code_vector_store.process_file(path)
@@ -80,8 +90,13 @@ def code_reader_func(file_name: str, query: str = None):
             explanation = code_vector_store.query_code(path, query)
         else:
             # Otherwise use general explanation
-            explanation = explain_code(content)
-            
+            explanation = explain_code(content, file_name=os.path.basename(file_name or path))
+
+        if len(content) > MAX_RETURNED_CONTENT_CHARS:
+            # Keep large files out of the agent's prompt; the explanation covers them
+            outline = [name for name, _ in split_into_chunks(content)]
+            content = f"({len(content.splitlines())} lines, not shown) Outline: " + ", ".join(outline)
+
         return {
             "file_content": content,
             "explanation": explanation
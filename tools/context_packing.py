@@ -0,0 +1,184 @@
+# tools/context_packing.py
+
+import os
+import re
+import threading
+from typing import List, Optional
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.utils import get_tokenizer
+from tracing import count, span
+
+# Chunks fetched per query before deduplication, reranking and packing
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "12"))
+# Chunks that may reach the LLM prompt once duplicates are dropped and the rest reranked
+CONTEXT_TOP_N = int(os.getenv("CONTEXT_TOP_N", "3"))
+# Tokens of retrieved context allowed into the LLM prompt
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+# Local cross-encoder used to rerank, e.g. cross-encoder/ms-marco-MiniLM-L-2-v2; unset disables it
+RERANK_MODEL = os.getenv("RERANK_MODEL", "")
+
+STOPWORDS = {"the", "and", "for", "with", "that", "this", "what", "how", "does", "which",
+             "are", "was", "were", "from", "into", "about", "code", "find"}
+
+def count_tokens(text: str) -> int:
+    return len(get_tokenizer()(text))
+
+def _shingles(text: str, size: int = 5) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+class NearDuplicateFilter(BaseNodePostprocessor):
+    """
+    Drop retrieved chunks that mostly repeat a higher-ranked chunk. Their
+    tokens count towards ``context_tokens_saved`` along with what the packer drops.
+    """
+
+    threshold: float = Field(default=0.8, description="Shingle Jaccard similarity above which a chunk is a duplicate.")
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "NearDuplicateFilter"
+
+    def _postprocess_nodes(self, nodes: List[NodeWithScore],
+                           query_bundle: Optional[QueryBundle] = None) -> List[NodeWithScore]:
+        kept, kept_shingles, dropped_tokens = [], [], 0
+        for node in nodes:
+            text = node.node.get_content()
+            shingles = _shingles(text)
+            if any(len(shingles & other) / max(1, len(shingles | other)) >= self.threshold
+                   for other in kept_shingles):
+                dropped_tokens += count_tokens(text)
+                continue
+            kept.append(node)
+            kept_shingles.append(shingles)
+        count("context_duplicates_dropped", len(nodes) - len(kept))
+        count("context_tokens_saved", dropped_tokens)
+        return kept
+
+class TokenBudgetPacker(BaseNodePostprocessor):
+    """
+    Pack the best ``top_n`` chunks into a token budget. Chunks longer than
+    ``max_chunk_tokens`` (large diffs, long files) are cut down to their first
+    lines plus windows around the lines that mention the query terms.
+    """
+
+    token_budget: int = Field(default=CONTEXT_TOKEN_BUDGET)
+    top_n: int = Field(default=CONTEXT_TOP_N, description="Most chunks sent to the LLM.")
+    max_chunk_tokens: int = Field(default=CONTEXT_TOKEN_BUDGET // 3)
+    min_chunk_tokens: int = Field(default=64, description="Smallest truncated chunk worth including.")
+    head_lines: int = Field(default=6, description="Leading lines always kept (commit header, signature).")
+    context_lines: int = Field(default=4, description="Lines kept either side of a matching line.")
+    _last_report: dict = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "TokenBudgetPacker"
+
+    @property
+    def last_report(self) -> dict:
+        """Token counts from the most recent query"""
+        return self._last_report
+
+    def _truncate(self, text: str, query: str, max_tokens: int) -> str:
+        lines = text.splitlines()
+        terms = {term for term in re.findall(r"\w+", query.lower())
+                 if len(term) > 2 and term not in STOPWORDS}
+
+        matches = [i for i, line in enumerate(lines) if any(term in line.lower() for term in terms)]
+        if matches:
+            keep = set(range(min(self.head_lines, len(lines))))
+            for i in matches:
+                keep.update(range(max(0, i - self.context_lines), min(len(lines), i + self.context_lines + 1)))
+        else:
+            # Nothing to centre on: keep as much of the start as fits
+            keep = range(len(lines))
+
+        kept_lines, used, previous = [], 0, -1
+        for i in sorted(keep):
+            piece = lines[i] if previous in (-1, i - 1) else "...\n" + lines[i]
+            tokens = count_tokens(piece) + 1
+            if used + tokens > max_tokens:
+                break
+            kept_lines.append(piece)
+            used += tokens
+            previous = i
+        if previous < len(lines) - 1:
+            kept_lines.append("...")
+        return "\n".join(kept_lines)
+
+    def _postprocess_nodes(self, nodes: List[NodeWithScore],
+                           query_bundle: Optional[QueryBundle] = None) -> List[NodeWithScore]:
+        query = query_bundle.query_str if query_bundle else ""
+        packed, used, candidates = [], 0, 0
+
+        with span("context.pack") as attrs:
+            # Savings are measured against sending every chunk received whole
+            dropped = sum(count_tokens(node.node.get_content()) for node in nodes[self.top_n:])
+            for node in nodes[:self.top_n]:
+                text = node.node.get_content()
+                tokens = count_tokens(text)
+                candidates += tokens
+                remaining = self.token_budget - used
+                if remaining < self.min_chunk_tokens:
+                    continue
+
+                limit = min(self.max_chunk_tokens, remaining)
+                if tokens > limit:
+                    text = self._truncate(text, query, limit)
+                    tokens = count_tokens(text)
+                    new_node = node.node.copy()
+                    new_node.set_content(text)
+                    node = NodeWithScore(node=new_node, score=node.score)
+
+                packed.append(node)
+                used += tokens
+
+            self._last_report = {
+                "chunks_in": len(nodes),
+                "chunks_out": len(packed),
+                "tokens_in": dropped + candidates,
+                "tokens_out": used,
+                "tokens_saved": dropped + candidates - used,
+                "tokens_truncated": candidates - used,
+            }
+            attrs.update(self._last_report)
+        count("context_tokens_saved", dropped + candidates - used)
+        return packed
+
+_reranker = None
+_reranker_lock = threading.Lock()
+
+def get_reranker():
+    """Load the local cross-encoder once, if one is configured"""
+    global _reranker
+    if not RERANK_MODEL:
+        return None
+    with _reranker_lock:
+        if _reranker is None:
+            from llama_index.core.postprocessor import SentenceTransformerRerank
+            # Reorder only; the packer makes the CONTEXT_TOP_N cut so it can report what it drops
+            _reranker = SentenceTransformerRerank(model=RERANK_MODEL, top_n=RETRIEVAL_TOP_K)
+    return _reranker
+
+def context_postprocessors(token_budget: int = CONTEXT_TOKEN_BUDGET) -> List[BaseNodePostprocessor]:
+    """Deduplicate, optionally rerank, then pack the best CONTEXT_TOP_N chunks into ``token_budget``"""
+    postprocessors = [NearDuplicateFilter()]
+    reranker = get_reranker()
+    if reranker is not None:
+        postprocessors.append(reranker)
+    postprocessors.append(TokenBudgetPacker(token_budget=token_budget, max_chunk_tokens=token_budget // 3))
+    return postprocessors
+
+def packed_query_engine(index, llm, token_budget: int = CONTEXT_TOKEN_BUDGET, **kwargs):
+    """Query engine that over-fetches and packs the results into a token budget"""
+    return index.as_query_engine(
+        llm=llm,
+        similarity_top_k=RETRIEVAL_TOP_K,
+        node_postprocessors=context_postprocessors(token_budget),
+        **kwargs
+    )
@@ -2,6 +2,11 @@
 
 from docx import Document
 from bs4 import BeautifulSoup
+from typing import Optional, Tuple
+import logging
+import os
+
+logger = logging.getLogger(__name__)
 
 def extract_docx(file_path: str) -> str:
     doc = Document(file_path)
@@ -16,4 +21,33 @@ def extract_markdown(file_path: str) -> str:
     with open(file_path, "r", encoding="utf-8") as f:
         return f.read()
 
+def extract_pdf(file_path: str) -> str:
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as pdf:
+        return "\n".join(page.get_text() for page in pdf)
+
+def extract_text(file_path: str) -> str:
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+# Map of file extension -> local extractor
+EXTRACTORS = {
+    ".pdf": extract_pdf,
+    ".docx": extract_docx,
+    ".html": extract_html,
+    ".md": extract_markdown,
+    ".py": extract_text,
+    ".txt": extract_text,
+    ".csv": extract_text,
+    ".json": extract_text,
+}
 
+def extract_file(file_path: str) -> Tuple[str, Optional[str]]:
+    """Extract a file with the extractor for its extension; text is None on failure"""
+    extractor = EXTRACTORS[os.path.splitext(file_path)[1].lower()]
+    try:
+        return file_path, extractor(file_path)
+    except Exception as e:
+        logger.warning("Skipping %s: %s", file_path, e)
+        return file_path, None
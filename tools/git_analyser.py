@@ -1,19 +1,25 @@
 # tools/git_analyser.py
 
 from datetime import datetime
-from llama_index.llms.ollama import Ollama
 from llama_index.core.tools import FunctionTool
 from llama_index.core import Document, VectorStoreIndex
-from llama_index.core.embeddings import resolve_embed_model
 from tools.git_history_loader import extract_commit_history, clone_repo
+from tools.context_packing import packed_query_engine
+from tools.models import get_embed_model, get_llm
+from tracing import traced
 import os
 
 class GitCommitVectorStore:
     def __init__(self):
-        self.embed_model = resolve_embed_model("local:BAAI/bge-m3")
-        self.llm = Ollama(model="llama3.2:3b-instruct-q6_K", request_timeout=500)
+        self.llm = get_llm()
         self.vector_stores = {}  # Map of repo_url -> VectorStoreIndex
         
+    @property
+    def embed_model(self):
+        """Shared embedding model, loaded the first time a repository is indexed"""
+        return get_embed_model()
+
+    @traced("git.index")
     def process_repo(self, repo_url: str, branch: str = None, limit: int = 100):
         """
         Creates or updates vector embeddings for a repository's commits
@@ -55,6 +61,7 @@ class GitCommitVectorStore:
             embed_model=self.embed_model
         )
         
+    @traced("git.query")
     def query_commits(self, repo_url: str, query: str, start_date: str = None,
                       end_date: str = None, limit: int = 100):
         """Query the vector store for relevant commits.
@@ -90,9 +97,10 @@ class GitCommitVectorStore:
             metadata_filters["date"] = date_filter
             
         # Query the vector store with local LLM
-        query_engine = vector_store.as_query_engine(
-            metadata_filters=metadata_filters if metadata_filters else None,
-            llm=self.llm
+        query_engine = packed_query_engine(
+            vector_store,
+            self.llm,
+            metadata_filters=metadata_filters if metadata_filters else None
         )
         response = query_engine.query(query)
         
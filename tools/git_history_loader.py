@@ -4,7 +4,9 @@ import os
 from git import Repo
 import shutil
 from datetime import datetime
+from tracing import traced
 
+@traced("git.history")
 def extract_commit_history(repo_path: str, branch: str = "master", limit: int = 100):
     """
     Extract commit history from a Git repository, including diffs.
@@ -36,6 +38,7 @@ def extract_commit_history(repo_path: str, branch: str = "master", limit: int =
         })
     return commit_docs
 
+@traced("git.clone")
 def clone_repo(repo_url: str, clone_path: str = "./temp_repo"):
     """
     Clone the repository from the given URL to a local path.
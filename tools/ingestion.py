@@ -0,0 +1,119 @@
+# tools/ingestion.py
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from llama_index.core import Document, VectorStoreIndex
+from tools.extractors import EXTRACTORS, extract_file
+from tools.models import get_embed_model
+from tracing import record_cache, traced
+import hashlib
+import multiprocessing
+import os
+from typing import Iterator, List, Optional
+
+EXTRACT_CACHE_DIR = ".extract_cache"
+
+class TextCache:
+    """Text stored on disk under a content hash (extractions, explanations)"""
+
+    def __init__(self, cache_dir: str = EXTRACT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.txt")
+
+    def get(self, digest: str) -> Optional[str]:
+        path = self._path(digest)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def put(self, digest: str, text: str):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._path(digest) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, self._path(digest))
+
+def file_digest(file_path: str) -> str:
+    """Hash of a file's extension and content, used as its cache key"""
+    sha = hashlib.sha256(os.path.splitext(file_path)[1].lower().encode("utf-8"))
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+def find_documents(directory: str) -> List[str]:
+    """Files under ``directory`` that have a local extractor"""
+    file_paths = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1].lower() in EXTRACTORS:
+                file_paths.append(os.path.join(dirpath, name))
+    return file_paths
+
+def _to_document(file_path: str, text: str) -> Document:
+    return Document(
+        text=text,
+        metadata={
+            "file_path": file_path,
+            "file_name": os.path.basename(file_path),
+        }
+    )
+
+def iter_documents(directory: str, max_workers: Optional[int] = None,
+                   cache: Optional[TextCache] = None) -> Iterator[Document]:
+    """
+    Extract every supported file under ``directory`` locally, yielding each
+    Document as soon as it is ready. Cached extractions are yielded first;
+    the remaining files are extracted across a process pool.
+    """
+    cache = cache or TextCache()
+    missing = {}
+    for path in find_documents(directory):
+        digest = file_digest(path)
+        text = cache.get(digest)
+        record_cache("extraction", text is not None)
+        if text is None:
+            missing[path] = digest
+        else:
+            yield _to_document(path, text)
+
+    if not missing:
+        return
+
+    max_workers = max_workers or os.cpu_count() or 1
+    pool = None
+    if len(missing) == 1 or max_workers == 1:
+        completed = (extract_file(path) for path in missing)
+    else:
+        # Spawned workers only import the lightweight extractors, and are safe
+        # to start from the background warm-up thread once torch is loaded
+        pool = ProcessPoolExecutor(
+            max_workers=min(max_workers, len(missing)),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        futures = [pool.submit(extract_file, path) for path in missing]
+        completed = (future.result() for future in as_completed(futures))
+
+    try:
+        for path, text in completed:
+            if text is None:
+                continue
+            cache.put(missing[path], text)
+            yield _to_document(path, text)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+@traced("ingestion.build_index")
+def build_index(directory: str, max_workers: Optional[int] = None) -> VectorStoreIndex:
+    """
+    Build a vector index over a directory, chunking and embedding each
+    document while the remaining files are still being extracted.
+    """
+    index = VectorStoreIndex([], embed_model=get_embed_model())
+    for document in iter_documents(directory, max_workers=max_workers):
+        index.insert(document)
+    return index
@@ -0,0 +1,49 @@
+# tools/models.py
+
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EMBED_MODEL_NAME = "local:BAAI/bge-m3"
+LLM_MODEL_NAME = "llama3.2:3b-instruct-q6_K"
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+
+_lock = threading.Lock()
+_embed_model = None
+
+def get_embed_model():
+    """
+    Load the embedding model on first use and share it between the agent and
+    every tool, instead of each one loading its own copy at import time.
+    """
+    global _embed_model
+    with _lock:
+        if _embed_model is None:
+            from llama_index.core.embeddings import resolve_embed_model
+            _embed_model = resolve_embed_model(EMBED_MODEL_NAME)
+    return _embed_model
+
+def set_embed_model(embed_model):
+    """Replace the shared embedding model (e.g. with a small stand-in for benchmarks)"""
+    global _embed_model
+    with _lock:
+        _embed_model = embed_model
+
+def get_llm(request_timeout: float = 500, llm_class=None, **kwargs):
+    """
+    Build an Ollama client for the local model, wired to the tracing
+    callback manager so its latency and token counts are recorded.
+    """
+    from llama_index.llms.ollama import Ollama
+    from tracing_callbacks import callback_manager
+
+    llm_class = llm_class or Ollama
+    return llm_class(
+        model=LLM_MODEL_NAME,
+        request_timeout=request_timeout,
+        base_url=OLLAMA_BASE_URL,
+        callback_manager=callback_manager,
+        **kwargs
+    )
@@ -0,0 +1,154 @@
+# tools/uploads.py
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from llama_index.core import Document, VectorStoreIndex
+from llama_index.core.tools import FunctionTool
+from tools.context_packing import packed_query_engine
+from tools.extractors import EXTRACTORS, extract_file
+from tools.models import get_embed_model, get_llm
+from tracing import span
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+UPLOAD_DIR = "uploads"
+
+# Upload session of the chat turn being answered, set by agent_query
+current_upload_session = contextvars.ContextVar("current_upload_session", default=None)
+
+@contextmanager
+def use_upload_session(session_key: Optional[str]):
+    token = current_upload_session.set(session_key)
+    try:
+        yield
+    finally:
+        current_upload_session.reset(token)
+
+class UploadStore:
+    """
+    Uploaded files, stored per session under their content hash and indexed
+    by a background worker into a session-scoped vector index, so the UI
+    never waits for extraction or embedding and sessions never see each
+    other's files.
+    """
+
+    def __init__(self, upload_dir: str = UPLOAD_DIR, max_workers: int = 1):
+        self.upload_dir = upload_dir
+        self.sessions = {}  # Map of session key -> {"files": {digest: record}, "index": VectorStoreIndex}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload-ingest")
+        self._llm = None
+
+    def _session(self, session_key: str) -> Dict:
+        return self.sessions.setdefault(session_key, {"files": {}, "index": None})
+
+    def save(self, session_key: str, file_name: str, data: bytes) -> Dict:
+        """Store an upload and queue it for indexing. Re-uploading the same content is a no-op."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            session = self._session(session_key)
+            if digest in session["files"]:
+                return session["files"][digest]
+
+            extension = os.path.splitext(file_name)[1].lower()
+            path = os.path.join(self.upload_dir, session_key, digest + extension)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+
+            record = {
+                "name": os.path.basename(file_name),
+                "path": path,
+                "digest": digest,
+                "status": "queued",
+                "error": None,
+                "uploaded_at": time.time(),
+            }
+            session["files"][digest] = record
+
+        self._executor.submit(self._ingest, session_key, record)
+        return record
+
+    def _ingest(self, session_key: str, record: Dict):
+        record["status"] = "indexing"
+        try:
+            with span("uploads.ingest", file=record["name"]):
+                if os.path.splitext(record["path"])[1] not in EXTRACTORS:
+                    raise ValueError("Unsupported file type")
+                _, text = extract_file(record["path"])
+                if text is None:
+                    raise ValueError("Could not extract text")
+
+                document = Document(
+                    text=text,
+                    metadata={
+                        "file_name": record["name"],
+                        "file_path": record["path"],
+                        "session": session_key,
+                    }
+                )
+                with self._lock:
+                    session = self._session(session_key)
+                    if session["index"] is None:
+                        session["index"] = VectorStoreIndex([], embed_model=get_embed_model())
+                    index = session["index"]
+                index.insert(document)
+            record["status"] = "ready"
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = str(e)
+
+    def uploads(self, session_key: str) -> List[Dict]:
+        """A session's uploads, oldest first"""
+        with self._lock:
+            records = list(self._session(session_key)["files"].values())
+        return sorted(records, key=lambda record: record["uploaded_at"])
+
+    def pending(self, session_key: str) -> List[Dict]:
+        """A session's uploads that are still waiting for or being indexed"""
+        return [record for record in self.uploads(session_key) if record["status"] in ("queued", "indexing")]
+
+    def resolve(self, session_key: Optional[str], file_name: Optional[str] = None) -> Optional[str]:
+        """Path of the session's upload called ``file_name``, or of its latest upload"""
+        if session_key is None:
+            return None
+        records = self.uploads(session_key)
+        if file_name:
+            records = [record for record in records if record["name"] == os.path.basename(file_name)]
+        return records[-1]["path"] if records else None
+
+    def query(self, session_key: str, query: str) -> str:
+        index = self._session(session_key)["index"]
+        if index is None:
+            if self.pending(session_key):
+                return "Uploaded files are still being indexed, please try again shortly."
+            return "No files have been uploaded in this session."
+        if self._llm is None:
+            self._llm = get_llm()
+        return packed_query_engine(index, self._llm).query(query).response
+
+# Global upload store instance
+upload_store = UploadStore()
+
+def session_uploads_query(query: str) -> Dict:
+    """Search the files uploaded in the current chat session"""
+    session_key = current_upload_session.get()
+    if session_key is None:
+        return {"response": "No upload session is active."}
+    try:
+        return {"response": upload_store.query(session_key, query)}
+    except Exception as e:
+        return {"response": f"Error searching uploads: {str(e)}"}
+
+session_uploads_tool = FunctionTool.from_defaults(
+    fn=session_uploads_query,
+    name="SessionUploads",
+    description=(
+        "Searches the files the user uploaded in this chat session (code, documents, PDFs). "
+        "Example query: 'What does the uploaded report say about latency?'"
+    )
+)
@@ -0,0 +1,174 @@
+# tracing.py
+
+import contextvars
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+METRIC_PREFIX = "rag_agent"
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, math.inf)
+
+class Trace:
+    """Timed spans and counters collected during one chat turn"""
+
+    def __init__(self, on_progress: Optional[Callable[[str, int, int], None]] = None):
+        self.start = time.perf_counter()
+        self.end = None
+        self.spans = []
+        self.counters = {}
+        self.on_progress = on_progress
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, start: float, duration: float, attrs: Dict):
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "start_ms": round((start - self.start) * 1000, 2),
+                "duration_ms": round(duration * 1000, 2),
+                **({"attrs": attrs} if attrs else {}),
+            })
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> Dict:
+        """JSON-ready summary, stored in chat_messages.metadata"""
+        end = self.end if self.end is not None else time.perf_counter()
+        stages = {}
+        for span in self.spans:
+            stage = stages.setdefault(span["name"], {"count": 0, "total_ms": 0.0})
+            stage["count"] += 1
+            stage["total_ms"] = round(stage["total_ms"] + span["duration_ms"], 2)
+        return {
+            "total_ms": round((end - self.start) * 1000, 2),
+            "stages": stages,
+            "counters": dict(self.counters),
+            "spans": sorted(self.spans, key=lambda span: span["start_ms"]),
+        }
+
+class Metrics:
+    """Process-wide counters and latency histograms in Prometheus text format"""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}  # Map of span name -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.setdefault(name, [[0] * len(LATENCY_BUCKETS), 0.0, 0])
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{METRIC_PREFIX}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+
+            metric = f"{METRIC_PREFIX}_span_seconds"
+            if self.histograms:
+                lines.append(f"# TYPE {metric} histogram")
+            for name, (buckets, total, count) in sorted(self.histograms.items()):
+                for bound, bucket_count in zip(LATENCY_BUCKETS, buckets):
+                    le = "+Inf" if bound == math.inf else f"{bound:g}"
+                    lines.append(f'{metric}_bucket{{span="{name}",le="{le}"}} {bucket_count}')
+                lines.append(f'{metric}_sum{{span="{name}"}} {total:.6f}')
+                lines.append(f'{metric}_count{{span="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+@contextmanager
+def start_trace(on_progress: Optional[Callable[[str, int, int], None]] = None):
+    """
+    Collect every span and counter recorded in this context into a new Trace.
+    ``on_progress(message, done, total)`` receives progress from long-running tools.
+    """
+    trace = Trace(on_progress)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.end = time.perf_counter()
+        _current_trace.reset(token)
+        metrics.observe("turn", trace.end - trace.start)
+
+def record_span(name: str, start: float, duration: float, attrs: Optional[Dict] = None):
+    metrics.observe(name, duration)
+    trace = current_trace()
+    if trace is not None:
+        trace.add_span(name, start, duration, attrs or {})
+
+@contextmanager
+def span(name: str, **attrs: Any):
+    """Time a block. Yields the attrs dict so the block can add to it."""
+    start = time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        record_span(name, start, time.perf_counter() - start, attrs)
+
+def traced(name: str):
+    """Decorator form of ``span``"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name: str, value: int = 1):
+    metrics.incr(name, value)
+    trace = current_trace()
+    if trace is not None:
+        trace.incr(name, value)
+
+def record_cache(name: str, hit: bool):
+    count(f"{name}_cache_hits" if hit else f"{name}_cache_misses")
+
+def report_progress(message: str, done: int, total: int):
+    """Pass progress of a long-running step to whoever started the current trace"""
+    trace = current_trace()
+    if trace is not None and trace.on_progress is not None:
+        trace.on_progress(message, done, total)
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve ``metrics`` at /metrics for Prometheus to scrape"""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,61 @@
+# tracing_callbacks.py
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from llama_index.core import Settings
+from llama_index.core.callbacks import CallbackManager, CBEventType, EventPayload
+from llama_index.core.callbacks.base_handler import BaseCallbackHandler
+from tracing import count, record_span
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Turns LlamaIndex callback events (LLM calls, embeddings, retrieval,
+    synthesis, ReAct steps and tool calls) into spans, and records the token
+    counts Ollama reports for each LLM call.
+    """
+
+    def __init__(self):
+        super().__init__(event_starts_to_ignore=[], event_ends_to_ignore=[])
+        self._starts = {}
+        self._lock = threading.Lock()
+
+    def on_event_start(self, event_type: CBEventType, payload: Optional[Dict[str, Any]] = None,
+                       event_id: str = "", parent_id: str = "", **kwargs: Any) -> str:
+        attrs = {}
+        if payload and event_type == CBEventType.FUNCTION_CALL and EventPayload.TOOL in payload:
+            attrs["tool"] = payload[EventPayload.TOOL].name
+        with self._lock:
+            self._starts[event_id] = (time.perf_counter(), attrs)
+        return event_id
+
+    def on_event_end(self, event_type: CBEventType, payload: Optional[Dict[str, Any]] = None,
+                     event_id: str = "", **kwargs: Any) -> None:
+        with self._lock:
+            started = self._starts.pop(event_id, None)
+        if started is None:
+            return
+        start, attrs = started
+
+        if event_type == CBEventType.LLM and payload:
+            response = payload.get(EventPayload.RESPONSE) or payload.get(EventPayload.COMPLETION)
+            raw = getattr(response, "raw", None) or {}
+            if isinstance(raw, dict):
+                attrs["tokens_in"] = raw.get("prompt_eval_count", 0)
+                attrs["tokens_out"] = raw.get("eval_count", 0)
+                count("llm_tokens_in", attrs["tokens_in"])
+                count("llm_tokens_out", attrs["tokens_out"])
+
+        record_span(event_type.value, start, time.perf_counter() - start, attrs)
+
+    def start_trace(self, trace_id: Optional[str] = None) -> None:
+        pass
+
+    def end_trace(self, trace_id: Optional[str] = None,
+                  trace_map: Optional[Dict[str, List[str]]] = None) -> None:
+        pass
+
+# Shared by every LLM, index and agent so their events land in the current trace
+callback_manager = CallbackManager([TracingCallbackHandler()])
+Settings.callback_manager = callback_manager